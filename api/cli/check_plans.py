@@ -0,0 +1,138 @@
+"""
+Check that the queries behind the routes are served by indexes.
+
+    python -m api.cli.check_plans
+
+Runs EXPLAIN on each route's query against the configured (seeded)
+PostgreSQL database and exits with status 1 if a plan contains a
+sequential scan, or a sort the index order should have made unnecessary.
+The statements come from api.queries, the functions the routes and jobs
+build their queries with. Sequential and bitmap scans are disabled for
+the check, so a tiny seed database reports the plan an index makes
+possible rather than the cheapest one for a handful of rows. The same
+checks run as tests (tests/test_query_plans.py) when DATABASE_URL points
+at PostgreSQL.
+"""
+import argparse
+import enum
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
+import orjson
+from api import queries
+from api.db import get_engine
+from api.models import Blog
+from config import get_settings
+
+settings = get_settings()
+
+# Node types that mean an index was not used for access or ordering
+FORBIDDEN_NODES = ("Seq Scan", "Sort", "Incremental Sort")
+
+
+def route_queries() -> List[tuple]:
+    """
+    (name, statement, node types allowed in the plan) for each route query,
+    built by the same functions (api.queries) the routes and jobs call
+    """
+    user_id = uuid.uuid4()
+    blog_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    after = (now, blog_id)
+
+    return [
+        ("GET /blogs/", queries.blog_feed(skip=20, limit=10), ()),
+        # Ranking by score needs a top-N sort, but only over the window the index returns
+        ("GET /blogs/trending", queries.trending_blogs(now - timedelta(days=settings.TRENDING_WINDOW_DAYS), 10), ("Sort",)),
+        ("GET /blogs/ keyset", queries.blog_feed(after=after, limit=10), ()),
+        # Tag matches come from a GIN bitmap scan, which returns rows unordered
+        ("GET /blogs/?tag=", queries.blog_feed(["python", "fastapi"], "all", limit=10), ("Sort",)),
+        ("GET /blogs/?tag=&match=any", queries.blog_feed(["python", "fastapi"], "any", limit=10), ("Sort",)),
+        ("GET /tags/", queries.tag_cloud(settings.TAG_CLOUD_SIZE), ()),
+        ("GET /blogs/{blog_id}", queries.blog_by_id(blog_id), ()),
+        # The eager-loaded blogs are joined through the author index, then sorted
+        # for the relationship's order; only one user's blogs are sorted
+        ("GET /users/{user_id}", queries.profile(user_id, [Blog.id, Blog.title, Blog.created_at], active_only=True), ("Sort",)),
+        ("GET /users/me/timeline entries", queries.timeline_entries(user_id, after, 20), ()),
+        ("GET /users/me/timeline read-time authors", queries.read_time_authors(user_id), ()),
+        ("GET /users/me/timeline author posts", queries.author_posts(user_id, after, 20), ()),
+        ("GET /blogs/{blog_id}/comments/", queries.comments_page(blog_id, 10, 10), ()),
+        ("reconcile_blog_counters", queries.live_comment_count(blog_id), ()),
+        ("POST /admin/users/{user_id}/deactivate comments", queries.user_comment_ids(user_id, settings.MODERATION_CHUNK_SIZE), ()),
+        ("fanout_blog followers", queries.follower_ids(user_id), ()),
+        ("POST /auth/login", queries.user_by_email("someone@example.com"), ()),
+        # Scheduled blogs are few per author, sorted after the user_id range scan
+        ("GET /blogs/drafts", queries.draft_blogs(user_id), ("Sort",)),
+        ("publish scheduler due", queries.due_scheduled_blogs(settings.PUBLISH_BATCH_SIZE), ()),
+        ("publish scheduler reload", queries.scheduled_publish_times(settings.PUBLISH_LOOKAHEAD), ()),
+        ("job worker claim", queries.due_jobs(10), ()),
+    ]
+
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _driver_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def explain(conn, statement) -> dict:
+    compiled = statement.compile(dialect=conn.dialect)
+    params = {key: _driver_value(value) for key, value in compiled.params.items()}
+    result = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    if isinstance(result, (str, bytes)):
+        result = orjson.loads(result)
+    return result[0]["Plan"]
+
+
+def plan_settings(conn) -> None:
+    """
+    Make the planner use an index whenever one fits: on a small seed
+    database a scan of the whole table, or a bitmap scan that loses the
+    index order, is cheaper than the index a large table needs
+    """
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    conn.exec_driver_sql("SET enable_bitmapscan = off")
+
+
+def plan_problems(plan: dict, allowed=()) -> List[str]:
+    """Forbidden nodes of a plan (and the tables they read), except the ``allowed`` ones"""
+    return [
+        f"{node['Node Type']}" + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+        for node in _plan_nodes(plan)
+        if node["Node Type"] in FORBIDDEN_NODES and node["Node Type"] not in allowed
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check route query plans for sequential scans and sorts")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args(argv)
+
+    checks = route_queries()
+    failures = 0
+    with get_engine().connect() as conn:
+        plan_settings(conn)
+        for name, statement, allowed in checks:
+            plan = explain(conn, statement)
+            bad = plan_problems(plan, allowed)
+            status = "FAIL" if bad else "ok"
+            print(f"{status:4} {name}" + (f": {', '.join(bad)}" if bad else ""))
+            if args.verbose or bad:
+                print(orjson.dumps(plan, option=orjson.OPT_INDENT_2).decode())
+            failures += bool(bad)
+
+    print(f"{failures} of {len(checks)} queries need attention" if failures else "All route queries use indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
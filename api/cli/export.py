@@ -0,0 +1,31 @@
+"""
+Dump users, blogs, comments and likes as NDJSON or CSV.
+
+    python -m api.cli.export --format ndjson --output dump.ndjson
+    python -m api.cli.export --user-id <uuid> --format csv > user.csv
+"""
+import argparse
+import sys
+from uuid import UUID
+from api.helper.export import EXPORT_FORMATS, stream_export
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export EchoBlog data with constant memory")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--user-id", type=UUID, default=None, help="Export a single user instead of everything")
+    parser.add_argument("--output", default="-", help="Output file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in stream_export(args.user_id, args.format):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
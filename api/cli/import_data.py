@@ -0,0 +1,259 @@
+"""
+Bulk-load users, blogs, comments and likes from NDJSON or CSV files.
+
+    python -m api.cli.import_data --users users.ndjson --blogs blogs.csv \\
+        --comments comments.ndjson --likes likes.csv --workers 8
+
+Files produced by ``python -m api.cli.export`` can be passed to every option:
+records carrying a ``type`` field are only loaded by the matching option.
+Rows are loaded with COPY, so the database must be PostgreSQL (the schema
+uses PostgreSQL arrays anyway).
+Chunks are prepared (password hashing, excerpts) and loaded in parallel
+worker processes, then counters are rebuilt in a final pass.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterator, List
+import orjson
+from sqlalchemy import text
+from api.db import get_engine
+from api.helper.text_helper import make_excerpt
+from api.helper.token_helper import password_hashing
+from api.models import Blog, Comment, User
+
+LIKES_STAGING_TABLE = "import_likes"
+NULL = "\\N"
+
+
+def read_records(path: str, record_type: str) -> Iterator[dict]:
+    """Records of an NDJSON or CSV file; records typed for another table are skipped"""
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(handle)
+        else:
+            rows = (orjson.loads(line) for line in handle if line.strip())
+        for row in rows:
+            if row.get("type", record_type) == record_type:
+                yield {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def chunked(records: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _uuid(value) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _timestamp(value) -> datetime:
+    if not value:
+        return datetime.now(timezone.utc)
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def prepare_users(records: List[dict]) -> List[dict]:
+    return [{
+        "id": _uuid(record.get("id") or uuid.uuid4()),
+        "username": record["username"],
+        "email": record["email"],
+        "password": record.get("password_hash") or password_hashing(record.get("password") or uuid.uuid4().hex),
+        "bio": record.get("bio", record.get("body", "")),
+        "title": record.get("title"),
+        "profile_image": record.get("profile_image"),
+        "role": str(record.get("role", "user")).upper(),
+        "follower_count": 0,
+        "following_count": 0,
+        "is_active": True,
+        "created_at": _timestamp(record.get("created_at")),
+        "updated_at": _timestamp(record.get("updated_at") or record.get("created_at")),
+    } for record in records]
+
+
+def prepare_blogs(records: List[dict]) -> List[dict]:
+    rows = []
+    for record in records:
+        description = record.get("description", record.get("body", ""))
+        rows.append({
+            "id": _uuid(record.get("id") or uuid.uuid4()),
+            "user_id": _uuid(record["user_id"]),
+            "title": record["title"],
+            "description": description,
+            "excerpt": make_excerpt(description),
+            "image_url": record.get("image_url"),
+            "like_count": 0,
+            "like_user": [],
+            "comment_count": 0,
+            "view_count": int(record.get("view_count", 0)),
+            "unique_view_count": 0,
+            "is_active": True,
+            "created_at": _timestamp(record.get("created_at")),
+            "updated_at": _timestamp(record.get("updated_at") or record.get("created_at")),
+        })
+    return rows
+
+
+def prepare_comments(records: List[dict]) -> List[dict]:
+    return [{
+        "id": _uuid(record.get("id") or uuid.uuid4()),
+        "blog_id": _uuid(record["blog_id"]),
+        "user_id": _uuid(record["user_id"]),
+        "comment": record.get("comment", record.get("body", "")),
+        "is_active": True,
+        "created_at": _timestamp(record.get("created_at")),
+        "updated_at": _timestamp(record.get("updated_at") or record.get("created_at")),
+    } for record in records]
+
+
+def prepare_likes(records: List[dict]) -> List[dict]:
+    return [{"blog_id": _uuid(record["blog_id"]), "user_id": str(record["user_id"])} for record in records]
+
+
+TABLES = {
+    "users": (User.__table__, prepare_users),
+    "blogs": (Blog.__table__, prepare_blogs),
+    "comments": (Comment.__table__, prepare_comments),
+    "likes": (None, prepare_likes),
+}
+
+
+def _copy_value(value):
+    if value is None:
+        return NULL
+    if isinstance(value, list):
+        return "{" + ",".join('"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"' for item in value) + "}"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(table_name: str, rows: List[dict]) -> None:
+    """Load rows with PostgreSQL COPY over the worker's raw connection"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+
+    connection = get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+                buffer
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def load_chunk(kind: str, records: List[dict]) -> int:
+    """Prepare and load one chunk; runs in a worker process"""
+    table, prepare = TABLES[kind]
+    rows = prepare(records)
+    if not rows:
+        return 0
+
+    copy_rows(LIKES_STAGING_TABLE if kind == "likes" else table.name, rows)
+    return len(rows)
+
+
+def _init_worker() -> None:
+    # Connections inherited from the parent process must not be reused
+    get_engine().dispose(close=False)
+
+
+def rebuild_counters(conn, with_likes: bool) -> None:
+    if with_likes:
+        conn.execute(text(f"""
+            UPDATE blogs b
+            SET like_user = merged.users, like_count = cardinality(merged.users)
+            FROM (
+                SELECT l.blog_id, array(SELECT DISTINCT unnest(coalesce(b2.like_user, '{{}}') || array_agg(l.user_id)::varchar[])) AS users
+                FROM {LIKES_STAGING_TABLE} l JOIN blogs b2 ON b2.id = l.blog_id
+                GROUP BY l.blog_id, b2.like_user
+            ) merged
+            WHERE b.id = merged.blog_id
+        """))
+    conn.execute(text("""
+        UPDATE blogs b
+        SET comment_count = c.total
+        FROM (SELECT blog_id, count(*) AS total FROM comments GROUP BY blog_id) c
+        WHERE b.id = c.blog_id AND b.comment_count IS DISTINCT FROM c.total
+    """))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load EchoBlog data")
+    for kind in TABLES:
+        parser.add_argument(f"--{kind}", help=f"NDJSON or CSV file of {kind}")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--reindex", action="store_true", help="REINDEX the loaded tables after loading")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        print(f"Imports need PostgreSQL, DATABASE_URL points to {engine.dialect.name}", file=sys.stderr)
+        return 1
+    if args.likes:
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE UNLOGGED TABLE IF NOT EXISTS {LIKES_STAGING_TABLE} (blog_id uuid NOT NULL, user_id text NOT NULL)"))
+    engine.dispose()
+
+    max_in_flight = 2 * (args.workers or os.cpu_count() or 1)
+    # Tables are loaded in foreign key order; chunks of one table load in parallel
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        for kind in TABLES:
+            path = getattr(args, kind)
+            if not path:
+                continue
+            started = time.monotonic()
+            total = 0
+            pending = set()
+            for chunk in chunked(read_records(path, kind.rstrip("s")), args.chunk_size):
+                # Keep a bounded number of chunks in flight instead of reading the whole file
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    total += sum(future.result() for future in done)
+                    print(f"{kind}: {total} rows loaded", file=sys.stderr)
+                pending.add(pool.submit(load_chunk, kind, chunk))
+            total += sum(future.result() for future in pending)
+            print(f"{kind}: {total} rows loaded in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+    with engine.begin() as conn:
+        # Author summaries are copied from users once, rather than per chunk
+        conn.execute(text("""
+            UPDATE blogs
+            SET author_username = (SELECT username FROM users WHERE users.id = blogs.user_id),
+                author_avatar_url = (SELECT profile_image FROM users WHERE users.id = blogs.user_id)
+            WHERE author_username IS NULL
+        """))
+        rebuild_counters(conn, with_likes=bool(args.likes))
+        if args.likes:
+            conn.execute(text(f"DROP TABLE {LIKES_STAGING_TABLE}"))
+
+    # ANALYZE/REINDEX cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("users", "blogs", "comments"):
+            if args.reindex:
+                conn.execute(text(f"REINDEX TABLE {table}"))
+            conn.execute(text(f"ANALYZE {table}"))
+    print("Counters and author summaries rebuilt", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
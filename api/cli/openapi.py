@@ -0,0 +1,35 @@
+"""
+Generate the OpenAPI schema at build time.
+
+    python -m api.cli.openapi [--output openapi.json]
+
+Writes the schema of the application's routes to OPENAPI_SCHEMA_PATH (or
+--output), which /openapi.json then serves as-is, so no worker has to build
+the schema from the routes. Run it as part of the build or deploy, after
+any change to the routes or schemas; a stale file documents the old API.
+"""
+import argparse
+import sys
+import orjson
+from config import get_settings
+
+settings = get_settings()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema to a file")
+    parser.add_argument("--output", default=settings.OPENAPI_SCHEMA_PATH, help="Schema file to write")
+    args = parser.parse_args(argv)
+
+    from main import app
+
+    schema = app.openapi()
+    body = orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
+    with open(args.output, "wb") as handle:
+        handle.write(body)
+    print(f"Wrote {len(schema['paths'])} paths ({len(body)} bytes) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
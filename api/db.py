@@ -1,32 +1,126 @@
-from sqlalchemy import create_engine
+import random
+import time
+from functools import lru_cache
+from typing import Optional
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from api.helper.cache import TTLCache
 from config import get_settings
 import logging
 
 settings = get_settings()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-try:
-    SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        echo=True,  
+# Replication lag in seconds; 0 when the replica has replayed everything it
+# received, or when the database is not a standby at all
+REPLICA_LAG_QUERY = text("""
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+""")
+
+def _create_engine(url: str, **kwargs) -> Engine:
+    return create_engine(
+        url,
         pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        **kwargs
     )
-   
-except Exception as e:
-    raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache
+def get_engine() -> Engine:
+    """Create the primary engine on first use rather than at import time"""
+    return _create_engine(settings.DATABASE_URL)
+
+@lru_cache
+def get_replica_engines() -> tuple:
+    """Engines for DATABASE_REPLICA_URLS, created on first use"""
+    return tuple(
+        _create_engine(url, connect_args={"connect_timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS})
+        for url in settings.DATABASE_REPLICA_URLS
+    )
+
+def dispose_engine() -> None:
+    """Close pooled connections, if the engines were ever created"""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_replica_engines.cache_info().currsize:
+        for engine in get_replica_engines():
+            engine.dispose()
+
+# engine -> (checked at, healthy)
+_replica_health = {}
+
+def _replica_is_healthy(engine: Engine) -> bool:
+    now = time.monotonic()
+    checked = _replica_health.get(engine)
+    if checked and now - checked[0] < settings.REPLICA_HEALTH_CHECK_SECONDS:
+        return checked[1]
+
+    try:
+        with engine.connect() as conn:
+            lag = conn.execute(REPLICA_LAG_QUERY).scalar() or 0
+        healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if not healthy:
+            logger.warning(f"Replica {engine.url.host} is {lag:.1f}s behind, reading from primary")
+    except Exception as e:
+        logger.warning(f"Replica {engine.url.host} health check failed: {str(e)}")
+        healthy = False
+
+    _replica_health[engine] = (now, healthy)
+    return healthy
+
+def get_read_engine() -> Engine:
+    """A random healthy replica, or the primary when none is usable"""
+    replicas = [engine for engine in get_replica_engines() if _replica_is_healthy(engine)]
+    return random.choice(replicas) if replicas else get_engine()
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# Clients (keyed by their token's subject, so refreshing the token keeps
+# them) that committed recently are sent to the primary so they read their
+# own writes
+_recent_writers = TTLCache(
+    maxsize=settings.READ_YOUR_WRITES_MAX_CLIENTS,
+    ttl=settings.READ_YOUR_WRITES_SECONDS
+)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_writer(session):
+    client = session.info.get("client")
+    if client:
+        _recent_writers.set(client, True)
+
+def _client_key(request: Request) -> Optional[str]:
+    """The verified subject of the request's bearer token, None without a valid one"""
+    if "client_key" in request.scope:
+        return request.scope["client_key"]
+
+    client = None
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            sub = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+            client = str(sub) if sub else None
+        except JWTError:
+            pass
+    request.scope["client_key"] = client
+    return client
+
+def has_recent_write(request: Request) -> bool:
+    """Whether the client committed within READ_YOUR_WRITES_SECONDS"""
+    client = _client_key(request)
+    return bool(client and _recent_writers.get(client))
+
+def _session_scope(db):
     try:
         yield db
     except Exception as e:
@@ -35,3 +129,20 @@ def get_db():
         raise
     finally:
         db.close()
+
+def get_db(request: Request):
+    """Session on the primary, for handlers that write"""
+    db = SessionLocal(bind=get_engine(), info={"client": _client_key(request)})
+    yield from _session_scope(db)
+
+def get_read_db(request: Request):
+    """
+    Session for read-only handlers. Uses a replica unless none is configured
+    or healthy, or the client wrote within READ_YOUR_WRITES_SECONDS.
+    """
+    if has_recent_write(request):
+        engine = get_engine()
+    else:
+        engine = get_read_engine()
+    db = SessionLocal(bind=engine)
+    yield from _session_scope(db)
@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from api.helper.profiling import timed
 from config import get_settings
 from typing import Optional
 from datetime import datetime
@@ -20,9 +21,10 @@ async def verify_token(token: Optional[str] = Depends(oauth2_scheme)) -> dict:
         )
     
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        with timed("jwt"):
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
         exp = payload.get("exp")
         
         if not exp or datetime.utcfromtimestamp(exp) < datetime.utcnow():
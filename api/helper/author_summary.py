@@ -0,0 +1,58 @@
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, attributes
+from api.db import SessionLocal
+from api.helper.jobs import enqueue
+from api.models import Blog, User
+from config import get_settings
+
+settings = get_settings()
+
+# User attribute -> Blog column holding its copy
+AUTHOR_FIELDS = {
+    "username": "author_username",
+    "profile_image": "author_avatar_url",
+}
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _enqueue_author_propagation(session: Session, flush_context, instances):
+    """Queue a propagation job in the same transaction as a username/avatar change"""
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        if any(attributes.get_history(obj, name).has_changes() for name in AUTHOR_FIELDS):
+            enqueue(session, "propagate_author", user_id=str(obj.id))
+
+
+def propagate_author(db: Session, user_id) -> int:
+    """
+    Copy the author's current username and profile image to their blogs,
+    AUTHOR_SYNC_CHUNK_SIZE blogs per transaction so a prolific author does
+    not lock all their blogs at once. Only stale blogs are touched, so a
+    retried or duplicate job does no extra writes. Returns the blogs updated.
+    """
+    author = db.execute(
+        select(User.username, User.profile_image).where(User.id == user_id)
+    ).first()
+    if not author:
+        return 0
+
+    values = {AUTHOR_FIELDS[name]: getattr(author, name) for name in AUTHOR_FIELDS}
+    stale = select(Blog.id).where(
+        Blog.user_id == user_id,
+        Blog.author_username.is_distinct_from(author.username)
+        | Blog.author_avatar_url.is_distinct_from(author.profile_image)
+    ).limit(settings.AUTHOR_SYNC_CHUNK_SIZE)
+
+    updated = 0
+    while True:
+        result = db.execute(
+            update(Blog)
+            .where(Blog.id.in_(stale.scalar_subquery()))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if not result.rowcount:
+            return updated
+        updated += result.rowcount
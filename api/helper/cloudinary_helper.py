@@ -1,18 +1,23 @@
-import cloudinary
-import cloudinary.uploader
 from fastapi import HTTPException, status
+from functools import lru_cache
 from typing import Optional
 import os
 from config import get_settings
 
 settings = get_settings()
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
-)
+@lru_cache
+def get_uploader():
+    """Import and configure the Cloudinary SDK on first use"""
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET
+    )
+    return cloudinary.uploader
 
 async def upload_image(file, folder: str = "blogs") -> Optional[str]:
     try:
@@ -31,7 +36,7 @@ async def upload_image(file, folder: str = "blogs") -> Optional[str]:
         await file.seek(0)
         
         # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
+        result = get_uploader().upload(
             contents,
             folder=folder,
             allowed_formats=['jpg', 'jpeg', 'png', 'gif'],
@@ -51,11 +56,15 @@ async def upload_image(file, folder: str = "blogs") -> Optional[str]:
             detail=f"Error uploading image: {str(e)}"
         )
 
-async def delete_image(image_url: str) -> bool:
+def destroy_image(image_url: str) -> bool:
+    """Blocking delete, for callers already off the event loop"""
     try:
         # Extract public_id from URL
         public_id = image_url.split('/')[-1].split('.')[0]
-        result = cloudinary.uploader.destroy(public_id)
+        result = get_uploader().destroy(public_id)
         return result.get('result') == 'ok'
     except Exception:
-        return False 
\ No newline at end of file
+        return False
+
+async def delete_image(image_url: str) -> bool:
+    return destroy_image(image_url)
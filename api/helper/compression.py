@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import zlib
+from typing import List, Optional, Tuple
+from api.helper.cache import TTLCache
+from config import get_settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+settings = get_settings()
+
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"application/javascript",
+    b"application/xml",
+    b"text/",
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding in an Accept-Encoding header: br, then gzip"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush after every chunk so streamed lines reach the client promptly
+        return self._compress(data) + self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """
+    Negotiates brotli/gzip for compressible responses of at least
+    COMPRESSION_MIN_SIZE bytes. Streaming responses are compressed chunk by
+    chunk. Complete bodies are looked up by content hash in a cache of
+    already compressed bodies, so a hot page is compressed once, not on
+    every request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cache = TTLCache(
+            maxsize=settings.COMPRESSION_CACHE_ENTRIES,
+            ttl=settings.COMPRESSION_CACHE_TTL_SECONDS
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compressed(self, body: bytes, encoding: str) -> bytes:
+        if len(body) > settings.COMPRESSION_CACHE_MAX_BODY:
+            return compress(body, encoding)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = compress(body, encoding)
+            self.cache.set(key, cached)
+        return cached
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.passthrough = False
+        self.stream: Optional[StreamCompressor] = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = dict(message.get("headers", []))
+            content_type = headers.get(b"content-type", b"")
+            self.passthrough = (
+                b"content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            data = self.stream.chunk(body) if body else b""
+            if not more_body:
+                data += self.stream.finish()
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        if not more_body:
+            # Complete body in a single message
+            if len(body) < settings.COMPRESSION_MIN_SIZE:
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            body = self.middleware.compressed(body, self.encoding)
+            await self._send(self._compressed_start(len(body)))
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        # Streaming response
+        self.stream = StreamCompressor(self.encoding)
+        await self._send(self._compressed_start(None))
+        await self._send({"type": "http.response.body", "body": self.stream.chunk(body), "more_body": True})
+
+    def _compressed_start(self, content_length: Optional[int]):
+        headers: List[Tuple[bytes, bytes]] = [
+            (name, value) for name, value in self.start_message.get("headers", [])
+            if name not in (b"content-length", b"content-encoding", b"vary")
+        ]
+        vary = [value for name, value in self.start_message.get("headers", []) if name == b"vary"]
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return {**self.start_message, "headers": headers}
@@ -0,0 +1,112 @@
+from typing import NamedTuple, Optional
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from api.db import SessionLocal, get_db
+from api.helper.auth_bearer import verify_token
+from api.helper.cache import TTLCache
+from api.models import User
+from config import get_settings
+
+settings = get_settings()
+
+
+class UserSnapshot(NamedTuple):
+    id: str
+    username: str
+    email: str
+    role: str
+    is_active: bool
+    profile_image: Optional[str]
+
+
+# sub -> UserSnapshot, so most requests don't query users at all
+_user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_USERS,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+def invalidate_user(user_id) -> None:
+    """Drop the cached snapshot of a user, e.g. after a role or status change"""
+    _user_cache.pop(str(user_id))
+
+# Changed users are evicted once their transaction commits: evicting at
+# flush would let a concurrent request re-cache the old row before commit
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_users", set()).add(str(target.id))
+
+@event.listens_for(SessionLocal, "after_commit")
+def _evict_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        invalidate_user(user_id)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
+
+def load_user_snapshot(db: Session, user_id: str) -> Optional[UserSnapshot]:
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    row = db.query(User.id, User.username, User.email, User.role, User.is_active, User.profile_image)\
+        .filter(User.id == user_id)\
+        .first()
+    if not row:
+        return None
+
+    snapshot = UserSnapshot(
+        id=str(row.id),
+        username=row.username,
+        email=row.email,
+        role=row.role.value,
+        is_active=bool(row.is_active),
+        profile_image=row.profile_image
+    )
+    _user_cache.set(user_id, snapshot)
+    return snapshot
+
+
+class CurrentUser:
+    """
+    Identity of the caller for one request. Role and active status come from
+    the (cached) users row rather than the token, so a demotion or
+    deactivation takes effect without waiting for the token to expire.
+    """
+
+    def __init__(self, token_data: dict, user: UserSnapshot):
+        self.token_data = token_data
+        self.user = user
+
+    @property
+    def sub(self) -> str:
+        return self.user.id
+
+    @property
+    def username(self) -> str:
+        return self.user.username
+
+    @property
+    def role(self) -> str:
+        return self.user.role
+
+    @property
+    def is_admin(self) -> bool:
+        return self.user.role == "admin"
+
+
+async def get_current_user(
+    db: Session = Depends(get_db),
+    token_data: dict = Depends(verify_token)
+) -> CurrentUser:
+    user = load_user_snapshot(db, str(token_data["sub"]))
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive or no longer exists"
+        )
+    return CurrentUser(token_data, user)
@@ -0,0 +1,102 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator
+import orjson
+from sqlalchemy import func, select
+from api.db import SessionLocal, get_read_engine
+from api.models import Blog, Comment, User
+from config import get_settings
+
+settings = get_settings()
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "type", "id", "user_id", "blog_id", "username", "email", "title", "body",
+    "like_count", "comment_count", "view_count", "created_at", "updated_at",
+]
+
+
+def _stream(db, statement) -> Iterator[dict]:
+    """Rows of ``statement`` fetched through a server-side cursor in batches"""
+    result = db.execute(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    for row in result:
+        yield row._asdict()
+
+
+def export_records(user_id=None) -> Iterator[dict]:
+    """
+    Users, blogs, comments and likes as flat records, either for one user
+    (their account, blogs, comments and the likes they gave) or for everyone.
+    Everything is streamed, so memory use does not grow with the data.
+    """
+    with SessionLocal(bind=get_read_engine()) as db:
+        users = select(
+            User.id, User.username, User.email, User.bio.label("body"), User.title,
+            User.created_at, User.updated_at
+        )
+        blogs = select(
+            Blog.id, Blog.user_id, Blog.title, Blog.description.label("body"),
+            Blog.like_count, Blog.comment_count, Blog.view_count, Blog.created_at, Blog.updated_at
+        )
+        comments = select(
+            Comment.id, Comment.user_id, Comment.blog_id, Comment.comment.label("body"),
+            Comment.created_at, Comment.updated_at
+        )
+        if user_id is not None:
+            likes = select(Blog.id.label("blog_id")).where(Blog.like_user.any(str(user_id)))
+            users = users.where(User.id == user_id)
+            blogs = blogs.where(Blog.user_id == user_id)
+            comments = comments.where(Comment.user_id == user_id)
+        else:
+            likes = select(Blog.id.label("blog_id"), func.unnest(Blog.like_user).label("user_id"))
+
+        for record_type, statement in (("user", users), ("blog", blogs), ("comment", comments)):
+            for record in _stream(db, statement):
+                yield {"type": record_type, **record}
+        for record in _stream(db, likes):
+            record.setdefault("user_id", user_id)
+            yield {"type": "like", **record}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_export(user_id=None, fmt: str = "ndjson") -> Iterator[bytes]:
+    """Export records encoded as NDJSON or CSV, in chunks of EXPORT_BATCH_SIZE records"""
+    batch_size = settings.EXPORT_BATCH_SIZE
+    records = export_records(user_id)
+
+    if fmt == "ndjson":
+        chunk = []
+        for record in records:
+            chunk.append(orjson.dumps(record))
+            if len(chunk) >= batch_size:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        count += 1
+        if count >= batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue().encode()
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import re
+import time
+from typing import Dict, List, NamedTuple, Tuple
+from fastapi.responses import JSONResponse
+from api.helper.cache import TTLCache
+from config import get_settings
+
+settings = get_settings()
+
+# POST endpoints that honour the Idempotency-Key header
+IDEMPOTENT_PATHS = [
+    re.compile(r"^/blogs/?$"),
+    re.compile(r"^/blogs/[^/]+/comments/?$"),
+]
+
+MAX_KEY_LENGTH = 255
+
+
+_BOUNDARY = re.compile(rb"boundary=\"?([^\";]+)")
+
+
+def _request_hash(content_type: bytes, body: bytes) -> bytes:
+    """
+    Digest of a request body. Clients pick a fresh multipart boundary for
+    every attempt, so it is left out of the digest of a form upload.
+    """
+    match = _BOUNDARY.search(content_type) if content_type.startswith(b"multipart/") else None
+    if match:
+        body = body.replace(match.group(1), b"")
+    return hashlib.sha256(body).digest()
+
+
+class StoredResponse(NamedTuple):
+    request_hash: bytes
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response for a repeated ``Idempotency-Key`` instead of
+    running the request again, so a retried POST cannot create a duplicate.
+    Keys are scoped to the caller's Authorization header and the path, and
+    responses are kept for IDEMPOTENCY_TTL_SECONDS (5xx responses are not
+    kept, so the client can retry them). A duplicate that arrives while the
+    first request is still running waits for it. Reusing a key with a
+    different request body is rejected with 422 rather than replayed. State
+    is per worker process.
+    """
+
+    def __init__(self, app, paths=None):
+        self.app = app
+        self.paths = IDEMPOTENT_PATHS if paths is None else paths
+        self.responses = TTLCache(
+            maxsize=settings.IDEMPOTENCY_MAX_KEYS,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS
+        )
+        self.in_flight: Dict[bytes, asyncio.Future] = {}
+        self._last_sweep = time.monotonic()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self._matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(b"idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}
+            )
+            await response(scope, receive, send)
+            return
+
+        self._sweep()
+        key = hashlib.sha256(
+            b"\0".join([headers.get(b"authorization", b""), scope["path"].encode(), idempotency_key])
+        ).digest()
+
+        body = await self._read_body(receive)
+        request_hash = _request_hash(headers.get(b"content-type", b""), body)
+
+        # Wait out every request running with this key: when it stored nothing
+        # (a 5xx or an error), exactly one of the woken duplicates runs next
+        while True:
+            stored = self.responses.get(key)
+            if stored is not None:
+                if stored.request_hash != request_hash:
+                    response = JSONResponse(
+                        status_code=422,
+                        content={"detail": "Idempotency-Key was already used with a different request body"}
+                    )
+                    await response(scope, receive, send)
+                    return
+                await self._replay(stored, send)
+                return
+            running = self.in_flight.get(key)
+            if running is None:
+                break
+            await asyncio.shield(running)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            await self._run_and_store(key, request_hash, scope, self._replay_body(body, receive), send)
+        finally:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+            future.set_result(None)
+
+    def _matches(self, path: str) -> bool:
+        return any(pattern.match(path) for pattern in self.paths)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep >= settings.IDEMPOTENCY_SWEEP_SECONDS:
+            self._last_sweep = now
+            self.responses.sweep()
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_body(body: bytes, receive):
+        """A receive channel that hands the buffered body to the app, then defers to the client's"""
+        sent = False
+
+        async def replay():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
+
+    async def _run_and_store(self, key: bytes, request_hash: bytes, scope, receive, send) -> None:
+        start = {}
+        body = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                if not message.get("more_body", False) and start and start["status"] < 500:
+                    self.responses.set(key, StoredResponse(
+                        request_hash=request_hash,
+                        status=start["status"],
+                        headers=list(start.get("headers", [])),
+                        body=b"".join(body)
+                    ))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    async def _replay(self, stored: StoredResponse, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
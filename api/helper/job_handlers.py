@@ -0,0 +1,54 @@
+from sqlalchemy import func, select, update
+from api import queries
+from api.db import SessionLocal, get_engine
+from api.helper.author_summary import propagate_author
+from api.helper.cloudinary_helper import destroy_image
+from api.helper.jobs import job_handler
+from api.helper.read_cache import blog_read_cache
+from api.helper.timeline import fan_out_blog, trim_timelines
+from api.models import Blog, Follow
+
+@job_handler("delete_image")
+def delete_image_job(image_url: str) -> None:
+    if not destroy_image(image_url):
+        raise RuntimeError(f"Cloudinary did not delete {image_url}")
+
+@job_handler("reconcile_blog_counters")
+def reconcile_blog_counters(blog_id: str) -> None:
+    """
+    Recompute like_count and comment_count from the source data. Queued by
+    comment writes, so they never lock or rewrite the blog row themselves.
+    """
+    comment_count = queries.live_comment_count(Blog.id).scalar_subquery()
+    with SessionLocal(bind=get_engine()) as db:
+        db.execute(
+            update(Blog)
+            .where(Blog.id == blog_id)
+            .values(
+                comment_count=comment_count,
+                like_count=func.coalesce(func.cardinality(Blog.like_user), 0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    blog_read_cache.invalidate(blog_id)
+
+@job_handler("fanout_blog")
+def fanout_blog(blog_id: str, author_id: str) -> None:
+    """Push a new blog into its author's followers' timelines"""
+    with SessionLocal(bind=get_engine()) as db:
+        fan_out_blog(db, blog_id, author_id)
+        db.commit()
+
+@job_handler("trim_timelines")
+def trim_timelines_job(author_id: str) -> None:
+    """Cut the author's followers' timelines back to TIMELINE_MAX_ENTRIES"""
+    with SessionLocal(bind=get_engine()) as db:
+        trim_timelines(db, select(Follow.follower_id).where(Follow.followee_id == author_id))
+        db.commit()
+
+@job_handler("propagate_author")
+def propagate_author_job(user_id: str) -> None:
+    """Copy a changed username or profile image to the author's blogs"""
+    with SessionLocal(bind=get_engine()) as db:
+        propagate_author(db, user_id)
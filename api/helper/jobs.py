@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from api import queries
+from api.db import SessionLocal, get_engine
+from api.models import Job, JobStatus
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# kind -> handler(**payload); handlers may be sync (run in a thread) or async
+HANDLERS: Dict[str, Callable] = {}
+
+def job_handler(kind: str):
+    """Register a function as the handler for jobs of ``kind``"""
+    def register(func: Callable) -> Callable:
+        HANDLERS[kind] = func
+        return func
+    return register
+
+def enqueue(db: Session, kind: str, delay_seconds: float = 0, **payload) -> Job:
+    """
+    Add a job to the caller's session. It is committed together with the
+    caller's own changes, so a job exists if and only if the change it
+    follows up on was persisted. Call ``job_worker.notify()`` after commit
+    to start it without waiting for the next poll.
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        run_at=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    )
+    db.add(job)
+    return job
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at JOB_MAX_BACKOFF_SECONDS"""
+    delay = min(settings.JOB_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.JOB_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+def _claim_jobs(limit: int) -> List[dict]:
+    """Atomically mark up to ``limit`` due jobs as running"""
+    with SessionLocal(bind=get_engine()) as db:
+        rows = db.execute(
+            update(Job)
+            .where(Job.id.in_(queries.due_jobs(limit).scalar_subquery()))
+            .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1, updated_at=func.now())
+            .returning(Job.id, Job.kind, Job.payload, Job.attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+    return [row._asdict() for row in rows]
+
+def _requeue_stale_jobs() -> None:
+    """Jobs left running longer than JOB_TIMEOUT_SECONDS belonged to a worker
+    that died; make them pending again"""
+    stale = func.now() - timedelta(seconds=settings.JOB_TIMEOUT_SECONDS)
+    with SessionLocal(bind=get_engine()) as db:
+        db.execute(
+            update(Job)
+            .where(Job.status == JobStatus.RUNNING, Job.updated_at < stale)
+            .values(status=JobStatus.PENDING, run_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+def _finish_job(job_id, error: Optional[str] = None, attempts: int = 0) -> None:
+    """Completed jobs are deleted so the table only holds outstanding work"""
+    with SessionLocal(bind=get_engine()) as db:
+        if error is None:
+            db.execute(delete(Job).where(Job.id == job_id))
+        elif attempts >= settings.JOB_MAX_ATTEMPTS:
+            db.execute(update(Job).where(Job.id == job_id).values(status=JobStatus.FAILED, last_error=error))
+        else:
+            db.execute(update(Job).where(Job.id == job_id).values(
+                status=JobStatus.PENDING,
+                last_error=error,
+                run_at=datetime.now(timezone.utc) + timedelta(seconds=retry_delay(attempts))
+            ))
+        db.commit()
+
+def queue_depth() -> Dict[str, int]:
+    """Number of outstanding jobs per status"""
+    with SessionLocal(bind=get_engine()) as db:
+        rows = db.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+    return {status.value: count for status, count in rows}
+
+
+class JobWorker:
+    """Pool of asyncio tasks that poll the jobs table and run handlers"""
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stats = {"succeeded": 0, "retried": 0, "failed": 0}
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        self._stopping = True
+        if self._wake:
+            self._wake.set()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers, e.g. right after committing new jobs"""
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                jobs = await asyncio.to_thread(_claim_jobs, 1)
+            except Exception as e:
+                logger.error(f"Error claiming jobs: {str(e)}")
+                jobs = []
+
+            if not jobs:
+                try:
+                    await asyncio.to_thread(_requeue_stale_jobs)
+                except Exception as e:
+                    logger.error(f"Error requeueing stale jobs: {str(e)}")
+                # Another worker may already have cleared the wake-up sent by stop()
+                if self._stopping:
+                    break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            for job in jobs:
+                await self._execute(job)
+
+    async def _execute(self, job: dict) -> None:
+        error = None
+        handler = HANDLERS.get(job["kind"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job['kind']}'")
+            if inspect.iscoroutinefunction(handler):
+                await handler(**job["payload"])
+            else:
+                await asyncio.to_thread(handler, **job["payload"])
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            logger.warning(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {error}")
+
+        if error is None:
+            self.stats["succeeded"] += 1
+        elif job["attempts"] >= settings.JOB_MAX_ATTEMPTS:
+            self.stats["failed"] += 1
+        else:
+            self.stats["retried"] += 1
+
+        try:
+            await asyncio.to_thread(_finish_job, job["id"], error, job["attempts"])
+        except Exception as e:
+            # The job stays running and is reclaimed after JOB_TIMEOUT_SECONDS
+            logger.error(f"Error recording result of job {job['id']}: {str(e)}")
+
+
+job_worker = JobWorker(
+    concurrency=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS
+)
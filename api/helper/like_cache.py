@@ -0,0 +1,32 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from api.helper.cache import TTLCache
+from config import get_settings
+
+settings = get_settings()
+
+# user id -> OrderedDict(blog id -> liked). A user's map expires as a whole
+# LIKE_CACHE_TTL_SECONDS after it was created, which bounds staleness when the
+# same user toggles a like on another worker.
+_recent_likes = TTLCache(
+    maxsize=settings.LIKE_CACHE_MAX_USERS,
+    ttl=settings.LIKE_CACHE_TTL_SECONDS
+)
+
+def remember_like(user_id: str, blog_id, liked: bool) -> None:
+    """Record the like status of a blog for a user"""
+    entries = _recent_likes.get(user_id)
+    if entries is None:
+        entries = OrderedDict()
+        _recent_likes.set(user_id, entries)
+
+    key = str(blog_id)
+    entries[key] = liked
+    entries.move_to_end(key)
+    while len(entries) > settings.LIKE_CACHE_MAX_BLOGS_PER_USER:
+        entries.popitem(last=False)
+
+def cached_like_statuses(user_id: str, blog_ids: Iterable) -> Dict[str, Optional[bool]]:
+    """Return the cached like status per blog id, None where unknown"""
+    entries = _recent_likes.get(user_id) or {}
+    return {str(blog_id): entries.get(str(blog_id)) for blog_id in blog_ids}
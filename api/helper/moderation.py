@@ -0,0 +1,171 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterator
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+from api import queries
+from api.db import SessionLocal, get_engine
+from api.helper.current_user import invalidate_user
+from api.helper.read_cache import blog_read_cache
+from api.helper.tags import release_blog_tags
+from api.models import Blog, BlogStatus, Comment, User
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def _in_chunks(db: Session, statement_for_chunk) -> Iterator[list]:
+    """
+    Run the statement built for each chunk until it returns no rows. The
+    caller commits each chunk before asking for the next, so locks are only
+    held for one chunk and the progress made survives an interrupted run.
+    """
+    while True:
+        rows = db.execute(
+            statement_for_chunk(settings.MODERATION_CHUNK_SIZE).execution_options(synchronize_session=False)
+        ).all()
+        if not rows:
+            return
+        yield rows
+
+
+def _evict_blogs(blog_ids) -> None:
+    """Drop cached reads of blogs (and their comments) changed by a committed chunk"""
+    for blog_id in set(blog_ids):
+        blog_read_cache.invalidate(str(blog_id))
+
+
+def _decrement_comment_counts(db: Session, removed: Counter) -> None:
+    if not removed:
+        return
+    # On the connection: Session.execute would take several parameter sets
+    # for an ORM bulk update by primary key
+    db.connection().execute(
+        update(Blog)
+        .where(Blog.id == bindparam("blog_id"))
+        .values(comment_count=func.greatest(Blog.comment_count - bindparam("removed"), 0))
+        .execution_options(synchronize_session=False),
+        [{"blog_id": blog_id, "removed": count} for blog_id, count in removed.items()]
+    )
+
+
+def comment_filter(pattern: str, regex: bool = False):
+    """Case-insensitive substring or regular expression match on the comment text"""
+    if regex:
+        return Comment.comment.op("~*")(pattern)
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return Comment.comment.ilike(f"%{escaped}%", escape="\\")
+
+
+def deactivate_user(user_id) -> Iterator[dict]:
+    """
+    Deactivate a user and soft-delete their blogs and comments, removing their
+    likes and fixing up comment/like/tag counters as it goes. Every step runs in
+    chunks of MODERATION_CHUNK_SIZE rows, each committed on its own, and
+    yields a progress record after each chunk; the last record is a summary.
+    An interrupted run keeps the chunks it committed, and running it again
+    picks up the rest.
+    """
+    user_id = str(user_id)
+    now = datetime.now(timezone.utc)
+    totals = {"blogs": 0, "comments": 0, "likes": 0}
+
+    with SessionLocal(bind=get_engine()) as db:
+        try:
+            found = db.execute(
+                update(User).where(User.id == user_id).values(is_active=False).returning(User.id)
+            ).first()
+            if not found:
+                yield {"step": "error", "detail": "User not found"}
+                return
+            db.commit()
+            invalidate_user(user_id)
+            yield {"step": "user", "processed": 1}
+
+            def blogs_chunk(size):
+                ids = select(Blog.id).where(Blog.user_id == user_id, Blog.deleted_at.is_(None)).limit(size)
+                return update(Blog).where(Blog.id.in_(ids.scalar_subquery()))\
+                    .values(deleted_at=now, is_active=False).returning(Blog.id, Blog.tags, Blog.status)
+
+            for rows in _in_chunks(db, blogs_chunk):
+                release_blog_tags(db, (row.tags for row in rows if row.status == BlogStatus.PUBLISHED))
+                db.commit()
+                _evict_blogs(row.id for row in rows)
+                totals["blogs"] += len(rows)
+                yield {"step": "blogs", "processed": totals["blogs"]}
+
+            def comments_chunk(size):
+                ids = queries.user_comment_ids(user_id, size)
+                return update(Comment).where(Comment.id.in_(ids.scalar_subquery()))\
+                    .values(deleted_at=now, is_active=False).returning(Comment.blog_id)
+
+            for rows in _in_chunks(db, comments_chunk):
+                removed = Counter(row.blog_id for row in rows)
+                _decrement_comment_counts(db, removed)
+                db.commit()
+                _evict_blogs(removed)
+                totals["comments"] += len(rows)
+                yield {"step": "comments", "processed": totals["comments"]}
+
+            # like_user has no index, so the liked blogs are found in one scan
+            # and then updated by primary key, a chunk at a time
+            liked = db.execute(select(Blog.id).where(Blog.like_user.any(user_id))).scalars().all()
+            for start in range(0, len(liked), settings.MODERATION_CHUNK_SIZE):
+                rows = db.execute(
+                    update(Blog)
+                    .where(Blog.id.in_(liked[start:start + settings.MODERATION_CHUNK_SIZE]), Blog.like_user.any(user_id))
+                    .values(
+                        like_user=func.array_remove(Blog.like_user, user_id),
+                        like_count=func.greatest(Blog.like_count - 1, 0)
+                    )
+                    .returning(Blog.id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                db.commit()
+                _evict_blogs(row.id for row in rows)
+                totals["likes"] += len(rows)
+                yield {"step": "likes", "processed": totals["likes"]}
+
+            yield {"step": "done", **totals}
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error deactivating user {user_id}: {str(e)}")
+            yield {"step": "error", "detail": f"Error deactivating user: {str(e)}"}
+
+
+def count_matching_comments(db: Session, pattern: str, regex: bool = False) -> int:
+    return db.execute(select(func.count()).select_from(Comment).where(comment_filter(pattern, regex))).scalar()
+
+
+def purge_comments(pattern: str, regex: bool = False) -> Iterator[dict]:
+    """
+    Delete every comment matching the pattern in chunks, decrementing the
+    comment counts of the affected blogs in the same transaction, which is
+    committed per chunk. Yields a progress record after each chunk; the last
+    record is a summary.
+    """
+    deleted = 0
+    with SessionLocal(bind=get_engine()) as db:
+        try:
+            def comments_chunk(size):
+                ids = select(Comment.id).where(comment_filter(pattern, regex)).limit(size)
+                return delete(Comment).where(Comment.id.in_(ids.scalar_subquery()))\
+                    .returning(Comment.blog_id, Comment.deleted_at)
+
+            for rows in _in_chunks(db, comments_chunk):
+                # Soft-deleted comments were already taken off the counters
+                _decrement_comment_counts(db, Counter(row.blog_id for row in rows if row.deleted_at is None))
+                db.commit()
+                _evict_blogs(row.blog_id for row in rows)
+                deleted += len(rows)
+                yield {"step": "comments", "processed": deleted}
+
+            yield {"step": "done", "comments": deleted}
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error purging comments: {str(e)}")
+            yield {"step": "error", "detail": f"Error purging comments: {str(e)}"}
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import threading
+from typing import Optional, Tuple
+import orjson
+from fastapi import FastAPI
+from fastapi.openapi.utils import get_openapi
+from config import get_settings
+
+settings = get_settings()
+
+_document: Optional[Tuple[bytes, str]] = None
+_document_lock = threading.Lock()
+
+
+def build_openapi_schema(app: FastAPI) -> dict:
+    """OpenAPI schema with bearer auth required on every route outside authentication"""
+    openapi_schema = get_openapi(
+        title=f"{settings.APP_NAME} API",
+        version=settings.APP_VERSION,
+        description="EchoBlog API documentation",
+        routes=app.routes,
+    )
+
+    # Added next to the generated model schemas, which the routes reference
+    openapi_schema.setdefault("components", {})["securitySchemes"] = {
+        "bearerAuth": {
+            "type": "http",
+            "scheme": "bearer",
+            "bearerFormat": "JWT",
+            "description": "Enter your JWT token"
+        }
+    }
+
+    for route in app.routes:
+        tags = getattr(route, "tags", None)
+        path = openapi_schema["paths"].get(getattr(route, "path", None))
+        if not tags or path is None or "authentication" in tags:
+            continue
+        for method in route.methods:
+            operation = path.get(method.lower())
+            if operation is not None:
+                operation["security"] = [{"bearerAuth": []}]
+
+    return openapi_schema
+
+
+def openapi_document(app: FastAPI) -> Tuple[bytes, str]:
+    """
+    The compact JSON schema and its ETag. Read from OPENAPI_SCHEMA_PATH when
+    the build produced it, otherwise generated on first use; either way once
+    per worker and never at startup.
+    """
+    global _document
+    if _document is None:
+        with _document_lock:
+            if _document is None:
+                if os.path.exists(settings.OPENAPI_SCHEMA_PATH):
+                    with open(settings.OPENAPI_SCHEMA_PATH, "rb") as handle:
+                        body = handle.read()
+                else:
+                    body = orjson.dumps(app.openapi())
+                # Weak, as the compression middleware may re-encode the body
+                etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                _document = (body, etag)
+    return _document
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
@@ -0,0 +1,256 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import get_settings
+
+settings = get_settings()
+
+CATEGORIES = ("db", "serialization", "jwt", "bcrypt")
+
+
+class RequestProfile:
+    """
+    Time spent per category during one sampled request. Categories are
+    exclusive: entering a nested category (e.g. a lazy load while
+    serializing) pauses the outer one, so the totals never double count.
+    """
+
+    __slots__ = ("timings", "overhead", "_stack")
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.overhead = 0.0
+        self._stack: List[list] = []
+
+    def enter(self, category: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.timings[parent[0]] = self.timings.get(parent[0], 0.0) + now - parent[1]
+        self._stack.append([category, now])
+        self.overhead += time.perf_counter() - now
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            category, started = self._stack.pop()
+            self.timings[category] = self.timings.get(category, 0.0) + now - started
+            if self._stack:
+                self._stack[-1][1] = now
+        self.overhead += time.perf_counter() - now
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+class timed:
+    """Attribute the enclosed block to a category if the request is being profiled"""
+
+    __slots__ = ("category", "profile")
+
+    def __init__(self, category: str):
+        self.category = category
+
+    def __enter__(self):
+        self.profile = _current_profile.get()
+        if self.profile is not None:
+            self.profile.enter(self.category)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profile is not None:
+            self.profile.exit()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None and context is not None:
+        context._request_profile = profile
+        profile.enter("db")
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = getattr(context, "_request_profile", None)
+    if profile is not None:
+        context._request_profile = None
+        profile.exit()
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    _after_cursor_execute(None, None, None, None, exception_context.execution_context, False)
+
+
+# (file, function) of the innermost Python frame of a thread that is parked:
+# idle threadpool workers, the log listener, the event loop's selector and
+# anything blocked on a lock, event or queue (sleeps and C-level waits show
+# up as their Python caller)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("handlers.py", "dequeue"),
+    ("queue.py", "get"),
+}
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+def _collapse(frame) -> str:
+    """One stack in collapsed format: root;...;leaf"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profiler:
+    """
+    Per-route aggregates of sampled requests plus on-demand stack captures.
+    Both are per worker process. The profiler's own bookkeeping is timed and
+    reported next to the results, so its cost stays visible.
+    """
+
+    def __init__(self, sample_rate: float):
+        self.sample_rate = sample_rate
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._overhead = 0.0
+        self._lock = threading.Lock()
+        self._capture_lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record(self, route: str, elapsed: float, profile: RequestProfile) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {"count": 0, "total": 0.0, "max": 0.0, **{name: 0.0 for name in CATEGORIES}}
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+            for name, seconds in profile.timings.items():
+                stats[name] = stats.get(name, 0.0) + seconds
+            self._overhead += profile.overhead + time.perf_counter() - started
+
+    def report(self) -> dict:
+        with self._lock:
+            routes = {}
+            sampled = 0
+            for route, stats in self._routes.items():
+                count = stats["count"]
+                sampled += count
+                accounted = sum(stats[name] for name in CATEGORIES)
+                routes[route] = {
+                    "count": count,
+                    "avg_ms": round(stats["total"] / count * 1000, 3),
+                    "max_ms": round(stats["max"] * 1000, 3),
+                    **{f"{name}_ms": round(stats[name] / count * 1000, 3) for name in CATEGORIES},
+                    "other_ms": round(max(stats["total"] - accounted, 0.0) / count * 1000, 3),
+                }
+            return {
+                "sample_rate": self.sample_rate,
+                "sampled_requests": sampled,
+                "overhead_ms_per_sampled_request": round(self._overhead / sampled * 1000, 4) if sampled else 0.0,
+                "routes": routes
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._overhead = 0.0
+
+    def capture(self, seconds: float, interval: float = 0.005) -> dict:
+        """
+        Sample the stacks of every other thread for ``seconds`` and write them
+        to PROFILE_OUTPUT_DIR in collapsed-stack format (flamegraph.pl and
+        speedscope read it). This is a wall-clock profile of the threads that
+        are busy: samples of parked threads (see IDLE_FRAMES) are skipped, but
+        a busy thread waiting on the database or the network is still counted.
+        Only one capture runs at a time.
+        """
+        if not self._capture_lock.acquire(blocking=False):
+            raise RuntimeError("A capture is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            idle = 0
+            sampling_time = 0.0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if _is_idle(frame):
+                        idle += 1
+                    else:
+                        stacks[_collapse(frame)] += 1
+                samples += 1
+                sampling_time += time.perf_counter() - started
+                time.sleep(interval)
+
+            os.makedirs(settings.PROFILE_OUTPUT_DIR, exist_ok=True)
+            path = os.path.join(
+                settings.PROFILE_OUTPUT_DIR,
+                f"wall-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}.folded"
+            )
+            with open(path, "w") as handle:
+                for stack, count in stacks.most_common():
+                    handle.write(f"{stack} {count}\n")
+
+            return {
+                "path": path,
+                "kind": "wall-clock, idle threads skipped",
+                "seconds": seconds,
+                "samples": samples,
+                "idle_thread_samples": idle,
+                "stacks": len(stacks),
+                # Sampling holds the GIL, so this is time taken from the app
+                "overhead_percent": round(sampling_time / seconds * 100, 3)
+            }
+        finally:
+            self._capture_lock.release()
+
+
+profiler = Profiler(sample_rate=settings.PROFILE_SAMPLE_RATE)
+
+
+class ProfilingMiddleware:
+    """Profiles a random PROFILE_SAMPLE_RATE fraction of requests, aggregated per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_profile.reset(token)
+            # The router stores the matched route in the scope, so requests
+            # are grouped by path template rather than by concrete path
+            route = getattr(scope.get("route"), "path", scope["path"])
+            profiler.record(f"{scope['method']} {route}", elapsed, profile)
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from api import queries
+from api.db import SessionLocal, get_engine
+from api.helper.jobs import enqueue, job_worker
+from api.helper.read_cache import blog_read_cache
+from api.helper.tags import count_blog_tags
+from api.models import Blog, BlogStatus
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def resolve_publication(requested: Optional[BlogStatus], publish_at: Optional[datetime]) -> Tuple[BlogStatus, Optional[datetime]]:
+    """
+    Status and publish time of a blog being created or updated. A publish
+    time without a status schedules the blog; scheduling needs a future time.
+    Naive times are taken as UTC.
+    """
+    if requested is None:
+        requested = BlogStatus.SCHEDULED if publish_at else BlogStatus.PUBLISHED
+    if requested != BlogStatus.SCHEDULED:
+        return requested, None
+
+    if publish_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="publish_at is required to schedule a blog"
+        )
+    if publish_at.tzinfo is None:
+        publish_at = publish_at.replace(tzinfo=timezone.utc)
+    if publish_at <= datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="publish_at must be in the future"
+        )
+    return requested, publish_at
+
+
+def publish_blog(db: Session, blog: Blog) -> None:
+    """
+    Publish a draft or scheduled blog now, in the caller's transaction. As
+    for the scheduler, the blog's publish_at and created_at become the time
+    it went out, which places it in the feeds; its tags are counted and
+    followers' timelines filled in the background.
+    """
+    blog.status = BlogStatus.PUBLISHED
+    blog.publish_at = blog.created_at = datetime.now(timezone.utc)
+    count_blog_tags(db, [blog.tags])
+    enqueue(db, "fanout_blog", blog_id=str(blog.id), author_id=str(blog.user_id))
+
+
+def _publish_due(limit: int) -> List[str]:
+    """
+    Publish up to ``limit`` due blogs in one transaction, counting their tags
+    and queueing their timeline fanout. created_at becomes the scheduled time
+    (see publish_blog). Rows are claimed with SKIP LOCKED, so schedulers of
+    several workers never publish the same blog twice.
+    """
+    with SessionLocal(bind=get_engine()) as db:
+        rows = db.execute(
+            update(Blog)
+            .where(Blog.id.in_(queries.due_scheduled_blogs(limit).scalar_subquery()))
+            .values(status=BlogStatus.PUBLISHED, created_at=Blog.publish_at)
+            .returning(Blog.id, Blog.user_id, Blog.tags)
+            .execution_options(synchronize_session=False)
+        ).all()
+        count_blog_tags(db, (row.tags for row in rows))
+        for row in rows:
+            enqueue(db, "fanout_blog", blog_id=str(row.id), author_id=str(row.user_id))
+        db.commit()
+    return [str(row.id) for row in rows]
+
+
+def _load_due_times(limit: int) -> List[float]:
+    """The next ``limit`` publish times, from the pending-posts index"""
+    with SessionLocal(bind=get_engine()) as db:
+        times = db.execute(queries.scheduled_publish_times(limit)).scalars().all()
+    return [publish_at.timestamp() for publish_at in times]
+
+
+class PublishScheduler:
+    """
+    Publishes scheduled blogs when they fall due. A heap of the next publish
+    times decides when to wake: it is loaded from the index of pending posts
+    on start and after every run, and this worker's own schedules are pushed
+    onto it as they are made. The table stays the source of truth, each run
+    publishing everything due in batches, so an entry for a blog that was
+    rescheduled or deleted only costs an empty run.
+    """
+
+    def __init__(self, batch_size: int, lookahead: int, reload_interval: float):
+        self.batch_size = batch_size
+        self.lookahead = lookahead
+        self.reload_interval = reload_interval
+        self.stats = {"published": 0, "runs": 0}
+        self._due: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10) -> None:
+        self._stopping = True
+        if self._wake:
+            self._wake.set()
+        if self._task:
+            _, pending = await asyncio.wait([self._task], timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._task = None
+
+    def schedule(self, publish_at: datetime) -> None:
+        """Wake up at ``publish_at``; call after committing a scheduled blog"""
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._push, publish_at.timestamp())
+
+    def _push(self, due: float) -> None:
+        heapq.heappush(self._due, due)
+        self._wake.set()
+
+    def publish_due(self) -> int:
+        """Publish every due blog, a batch per transaction; returns how many"""
+        published = 0
+        while True:
+            blog_ids = _publish_due(self.batch_size)
+            for blog_id in blog_ids:
+                blog_read_cache.invalidate(blog_id)
+            published += len(blog_ids)
+            if len(blog_ids) < self.batch_size:
+                return published
+
+    async def _run(self) -> None:
+        next_reload = 0.0
+        while not self._stopping:
+            started = time.time()
+            if started >= next_reload or (self._due and self._due[0] <= started):
+                try:
+                    published = await asyncio.to_thread(self.publish_due)
+                    self.stats["runs"] += 1
+                    if published:
+                        self.stats["published"] += published
+                        logger.info(f"Published {published} scheduled blogs")
+                        job_worker.notify()
+                    due = await asyncio.to_thread(_load_due_times, self.lookahead)
+                    heapq.heapify(due)
+                    self._due = due
+                except Exception as e:
+                    logger.error(f"Error publishing scheduled blogs: {str(e)}")
+                next_reload = time.time() + self.reload_interval
+                # Entries due before the run were handled by it, or belong to
+                # blogs another worker is publishing or that are no longer scheduled
+                while self._due and self._due[0] <= started:
+                    heapq.heappop(self._due)
+
+            wake_at = min(self._due[0], next_reload) if self._due else next_reload
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(wake_at - time.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+publish_scheduler = PublishScheduler(
+    batch_size=settings.PUBLISH_BATCH_SIZE,
+    lookahead=settings.PUBLISH_LOOKAHEAD,
+    reload_interval=settings.PUBLISH_RELOAD_SECONDS
+)
@@ -0,0 +1,142 @@
+import math
+from abc import ABC, abstractmethod
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from config import get_settings
+
+settings = get_settings()
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parse a "<requests>/<seconds>" budget such as "10/60" """
+    requests, seconds = rate.split("/")
+    return int(requests), float(seconds)
+
+
+class RateLimitStore(ABC):
+    """
+    Token-bucket storage. The in-memory store below keeps budgets per worker
+    process; implement ``hit`` on a shared backend (e.g. Redis) to enforce
+    them across workers and hosts.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, capacity: int, period: float) -> float:
+        """Take one token from ``key``'s bucket. Returns 0 when the request is
+        allowed, otherwise the seconds until a token becomes available."""
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Token buckets in an LRU dict: O(1) per active key, least recently
+    used keys are evicted past ``max_keys`` (an evicted key starts full)."""
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, capacity: int, period: float) -> float:
+        refill_rate = capacity / period
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(capacity)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                self._buckets.move_to_end(key)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                retry_after = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / refill_rate
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RateLimitRule(NamedTuple):
+    name: str
+    method: str
+    path: "re.Pattern"
+    capacity: int
+    period: float
+
+
+def default_rules() -> List[RateLimitRule]:
+    rules = [
+        ("login", "POST", r"^/auth/login/?$", settings.RATE_LIMIT_LOGIN),
+        ("signup", "POST", r"^/auth/signup/?$", settings.RATE_LIMIT_SIGNUP),
+        ("like", "PATCH", r"^/blogs/[^/]+/like/?$", settings.RATE_LIMIT_LIKE),
+        ("comment", "POST", r"^/blogs/[^/]+/comments/?$", settings.RATE_LIMIT_COMMENT),
+    ]
+    return [
+        RateLimitRule(name, method, re.compile(pattern), *parse_rate(rate))
+        for name, method, pattern, rate in rules
+    ]
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying per-route token buckets. Requests are keyed by
+    the JWT ``sub`` when a valid bearer token is sent, otherwise by client IP.
+    Rejected requests get a 429 with a Retry-After header.
+    """
+
+    def __init__(self, app, rules: Optional[List[RateLimitRule]] = None, store: Optional[RateLimitStore] = None):
+        self.app = app
+        self.rules = default_rules() if rules is None else rules
+        self.store = store or MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._match(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.store.hit(f"{rule.name}:{self._identity(scope)}", rule.capacity, rule.period)
+        if retry_after:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please try again later"},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _match(self, scope) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if scope["method"] == rule.method and rule.path.match(scope["path"]):
+                return rule
+        return None
+
+    def _identity(self, scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                        if payload.get("sub"):
+                            return f"user:{payload['sub']}"
+                    except JWTError:
+                        pass
+                break
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
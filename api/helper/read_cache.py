@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Any, Callable, Hashable
+from sqlalchemy.engine import Engine
+from api.db import get_engine, get_read_engine
+from api.helper.cache import TTLCache
+from api.helper.singleflight import SingleFlight
+from config import get_settings
+
+settings = get_settings()
+
+_MISSING = object()
+
+
+class CoalescingCache:
+    """
+    Short-lived cache of serialized read responses in front of a single-flight
+    group. On a miss, including right after an entry expires, only one fetch
+    per key runs in this worker and every concurrent request shares its
+    result, so a hot entry expiring does not stampede the database.
+
+    Entries belong to a group (e.g. one blog) that writers invalidate after
+    commit. An entry fetched before the group's last invalidation is treated
+    as a miss, so a fetch racing a write cannot re-cache the old data. Other
+    workers see the write once their entry expires (READ_CACHE_TTL_SECONDS).
+    Groups invalidated within READ_YOUR_WRITES_SECONDS are refilled from the
+    primary (see read_engine), so a lagging replica cannot re-cache the old data.
+
+    ``fetch`` is called with the engine to read from. Requests of a client
+    that wrote recently (see has_recent_write) pass ``primary=True`` to skip
+    the cache and read their own writes from the primary.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        # group -> monotonic time of its last invalidation, kept while an entry
+        # could predate it or a replica could still be behind it
+        self._invalidated = TTLCache(maxsize=maxsize, ttl=max(ttl, settings.READ_YOUR_WRITES_SECONDS))
+        self._flight = SingleFlight()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    async def get(self, group: Hashable, key: Hashable, fetch: Callable[[Engine], Any], primary: bool = False) -> Any:
+        if primary:
+            self.stats["bypassed"] += 1
+            return await asyncio.to_thread(fetch, get_engine())
+
+        cache_key = (group, key)
+        entry = self._entries.get(cache_key, _MISSING)
+        if entry is not _MISSING:
+            fetched_at, value = entry
+            if fetched_at >= self._invalidated.get(group, 0.0):
+                self.stats["hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        # Stamped with when the shared fetch started, not when this caller
+        # joined it, so a fetch begun before a write is never taken for fresh
+        fetched_at, value = await self._flight.do(
+            cache_key, lambda: (time.monotonic(), fetch(self.read_engine(group)))
+        )
+        self._entries.set(cache_key, (fetched_at, value))
+        return value
+
+    def invalidate(self, group: Hashable) -> None:
+        self._invalidated.set(group, time.monotonic())
+
+    def read_engine(self, group: Hashable) -> Engine:
+        """
+        Engine to refill a group from: the primary while a write to it may not
+        have reached the replicas yet, otherwise a replica (see get_read_db)
+        """
+        invalidated = self._invalidated.get(group)
+        if invalidated is not None and time.monotonic() - invalidated < settings.READ_YOUR_WRITES_SECONDS:
+            return get_engine()
+        return get_read_engine()
+
+    def metrics(self) -> dict:
+        requests = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            **self._flight.stats,
+            "in_flight": len(self._flight),
+            "entries": len(self._entries),
+            "hit_ratio": round(self.stats["hits"] / requests, 4) if requests else 0.0,
+        }
+
+
+# Serialized GET /blogs/{id} and comment pages, grouped by blog id
+blog_read_cache = CoalescingCache(
+    maxsize=settings.READ_CACHE_MAX_ENTRIES,
+    ttl=settings.READ_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,76 @@
+import copy
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from typing import Any, Collection, Dict, Iterable, Optional, Type
+from api.helper.profiling import timed
+from api.schemas.blog import BlogResponse
+from api.schemas.comment import CommentResponse
+from api.schemas.tag import TagResponse
+from api.schemas.user import BlogInProfile, UserProfileResponse
+
+
+class ModelSerializer:
+    """
+    Turns trusted ORM objects (or dicts) into plain dicts following a response
+    schema, without running Pydantic validation. The field list is resolved
+    once; orjson then encodes UUIDs, datetimes and enums natively.
+    """
+
+    def __init__(self, schema: Type[BaseModel], nested: Optional[Dict[str, "ModelSerializer"]] = None):
+        self.schema = schema
+        self.nested = nested or {}
+        self.fields = tuple(
+            (name, None if field.is_required() else field.default)
+            for name, field in schema.model_fields.items()
+        )
+
+    @property
+    def field_names(self) -> tuple:
+        return tuple(name for name, _ in self.fields)
+
+    def only(self, names: Collection[str]) -> "ModelSerializer":
+        """Serializer restricted to the given fields, in schema order"""
+        serializer = copy.copy(self)
+        serializer.fields = tuple(field for field in self.fields if field[0] in names)
+        return serializer
+
+    def exclude(self, names: Collection[str]) -> "ModelSerializer":
+        return self.only([name for name in self.field_names if name not in names])
+
+    def to_dict(self, obj: Any) -> dict:
+        getter = obj.get if isinstance(obj, dict) else lambda name, default=None: getattr(obj, name, default)
+        data = {}
+        for name, default in self.fields:
+            value = getter(name, None)
+            if value is None:
+                value = default
+            elif name in self.nested:
+                value = self.nested[name].to_list(value)
+            data[name] = value
+        return data
+
+    def to_list(self, objs: Iterable[Any]) -> list:
+        to_dict = self.to_dict
+        return [to_dict(obj) for obj in objs]
+
+    def response(self, data: Any, many: bool = False, status_code: int = 200) -> ORJSONResponse:
+        with timed("serialization"):
+            content = self.to_list(data) if many else self.to_dict(data)
+            return ORJSONResponse(content=content, status_code=status_code)
+
+
+blog_serializer = ModelSerializer(BlogResponse)
+comment_serializer = ModelSerializer(CommentResponse)
+tag_serializer = ModelSerializer(TagResponse)
+profile_serializer = ModelSerializer(
+    UserProfileResponse,
+    nested={"blogs": ModelSerializer(BlogInProfile)}
+)
+
+# view=summary: list items carry the stored excerpt instead of the full text
+SUMMARY_EXCLUDED_FIELDS = ("description",)
+blog_summary_serializer = blog_serializer.exclude(SUMMARY_EXCLUDED_FIELDS)
+profile_summary_serializer = ModelSerializer(
+    UserProfileResponse,
+    nested={"blogs": ModelSerializer(BlogInProfile).exclude(SUMMARY_EXCLUDED_FIELDS)}
+)
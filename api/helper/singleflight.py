@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the
+    blocking ``fetch`` in a thread, and it and every later caller await the
+    same result (or exception) instead of running their own. The call runs
+    in a task of its own, so a caller going away never cancels it for the
+    others. Nothing is kept once the call finishes; pair it with a cache for that.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"executed": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(asyncio.to_thread(fetch))
+            self._calls[key] = task
+            self.stats["executed"] += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # shield: a caller being cancelled must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieving the exception also keeps it from being logged as never
+        # retrieved when every caller has gone away
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def __len__(self) -> int:
+        return len(self._calls)
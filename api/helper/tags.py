@@ -0,0 +1,115 @@
+import base64
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from api.models import Blog, BlogStatus, BlogTag, Tag
+from config import get_settings
+
+settings = get_settings()
+
+TAG_PATTERN = re.compile(r"^[a-z0-9][a-z0-9-]{0,49}$")
+
+
+def normalize_tags(raw: Optional[Iterable[str]]) -> List[str]:
+    """
+    Lowercased, de-duplicated tag names in their original order. Each item
+    may itself be comma-separated, so ``tag=a,b`` and ``tag=a&tag=b`` agree.
+    """
+    tags = []
+    for item in raw or []:
+        for name in item.split(","):
+            name = name.strip().lower().lstrip("#")
+            if not name:
+                continue
+            if not TAG_PATTERN.match(name):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid tag '{name}': use letters, digits and dashes, at most 50 characters"
+                )
+            if name not in tags:
+                tags.append(name)
+    if len(tags) > settings.MAX_TAGS_PER_BLOG:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.MAX_TAGS_PER_BLOG} tags are allowed"
+        )
+    return tags
+
+
+def adjust_tag_counts(db: Session, deltas: Counter) -> None:
+    """Apply post_count changes per tag in one statement"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    # Run on the session's connection: Session.execute would take an UPDATE
+    # with several parameter sets for an ORM bulk update by primary key
+    db.connection().execute(
+        update(Tag)
+        .where(Tag.name == bindparam("tag_name"))
+        .values(post_count=func.greatest(Tag.post_count + bindparam("delta"), 0))
+        .execution_options(synchronize_session=False),
+        [{"tag_name": name, "delta": delta} for name, delta in deltas.items()]
+    )
+
+
+def set_blog_tags(db: Session, blog: Blog, tags: List[str]) -> None:
+    """
+    Replace a flushed blog's tags: the tags array used for filtering, the
+    blog_tags rows and, for a published blog, the post counts of the tags
+    added or removed, all in the caller's transaction. Post counts only cover
+    published blogs; count_blog_tags adds a blog's tags when it is published.
+    """
+    old = set(blog.tags or [])
+    new = set(tags)
+    added, removed = new - old, old - new
+
+    if added:
+        db.execute(insert(Tag).values([{"name": name} for name in sorted(added)]).on_conflict_do_nothing())
+        db.execute(insert(BlogTag).values([{"blog_id": blog.id, "tag": name} for name in sorted(added)]).on_conflict_do_nothing())
+    if removed:
+        db.execute(delete(BlogTag).where(BlogTag.blog_id == blog.id, BlogTag.tag.in_(removed)))
+
+    if blog.status == BlogStatus.PUBLISHED:
+        deltas = Counter({name: 1 for name in added})
+        deltas.subtract({name: 1 for name in removed})
+        adjust_tag_counts(db, deltas)
+    blog.tags = list(tags)
+
+
+def count_blog_tags(db: Session, tag_lists: Iterable[Optional[List[str]]]) -> None:
+    """Add blogs that are being published to their tags' post counts"""
+    deltas = Counter()
+    for tags in tag_lists:
+        deltas.update(tags or [])
+    adjust_tag_counts(db, deltas)
+
+
+def release_blog_tags(db: Session, tag_lists: Iterable[Optional[List[str]]]) -> None:
+    """Take published blogs that are being deleted off their tags' post counts"""
+    deltas = Counter()
+    for tags in tag_lists:
+        deltas.subtract(tags or [])
+    adjust_tag_counts(db, deltas)
+
+
+def encode_cursor(created_at: datetime, blog_id) -> str:
+    """Opaque keyset cursor pointing just after a blog in newest-first order"""
+    return base64.urlsafe_b64encode(orjson.dumps([created_at.isoformat(), str(blog_id)])).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, blog_id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), UUID(blog_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
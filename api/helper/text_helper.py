@@ -0,0 +1,15 @@
+from config import get_settings
+
+settings = get_settings()
+
+def make_excerpt(text: str, length: int = None) -> str:
+    """Whitespace-collapsed prefix of ``text`` cut on a word boundary"""
+    length = length or settings.EXCERPT_LENGTH
+    text = " ".join((text or "").split())
+    if len(text) <= length:
+        return text
+
+    cut = text[:length - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" .,;:") + "…"
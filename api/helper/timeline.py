@@ -0,0 +1,134 @@
+import heapq
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import delete, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from api import queries
+from api.helper.jobs import enqueue
+from api.models import Blog, BlogStatus, Job, JobStatus, TimelineEntry, User
+from config import get_settings
+
+settings = get_settings()
+
+# Authors with at least TIMELINE_FANOUT_MAX_FOLLOWERS followers are not
+# fanned out on write; their posts are merged into timelines when read.
+
+def is_fanout_author(follower_count: int) -> bool:
+    return (follower_count or 0) < settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+
+def trim_timelines(db: Session, user_ids) -> int:
+    """
+    Keep only the newest TIMELINE_MAX_ENTRIES entries of each timeline of
+    ``user_ids`` (a one-column select). Each timeline's cutoff, its first entry
+    past the cap, is read walking the timeline's keyset index, so nothing is
+    sorted and only timelines over the cap lose rows. Returns the number of
+    entries removed.
+    """
+    owners = user_ids.subquery()
+    owner_id = list(owners.c)[0]
+    cutoff = select(TimelineEntry.created_at, TimelineEntry.blog_id)\
+        .where(TimelineEntry.user_id == owner_id)\
+        .order_by(TimelineEntry.created_at.desc(), TimelineEntry.blog_id.desc())\
+        .offset(settings.TIMELINE_MAX_ENTRIES)\
+        .limit(1)\
+        .lateral()
+    overflow = select(owner_id.label("user_id"), cutoff.c.created_at, cutoff.c.blog_id)\
+        .select_from(owners.join(cutoff, literal(True))).subquery()
+
+    result = db.execute(
+        delete(TimelineEntry)
+        .where(
+            TimelineEntry.user_id == overflow.c.user_id,
+            tuple_(TimelineEntry.created_at, TimelineEntry.blog_id) <= tuple_(overflow.c.created_at, overflow.c.blog_id)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def queue_timeline_trim(db: Session, author_id) -> None:
+    """
+    Queue trimming the timelines of an author's followers in the caller's
+    transaction, unless a trim for the author is already waiting: the fan-outs
+    of one TIMELINE_TRIM_DELAY_SECONDS window share one trim.
+    """
+    waiting = db.execute(
+        select(Job.id).where(
+            Job.kind == "trim_timelines",
+            Job.status == JobStatus.PENDING,
+            Job.payload["author_id"].as_string() == str(author_id)
+        ).limit(1)
+    ).first()
+    if not waiting:
+        enqueue(db, "trim_timelines", delay_seconds=settings.TIMELINE_TRIM_DELAY_SECONDS, author_id=str(author_id))
+
+def fan_out_blog(db: Session, blog_id, author_id) -> int:
+    """Push a new blog into the timelines of its author's followers.
+    Returns the number of timelines written, 0 for read-time authors."""
+    follower_count = db.execute(select(User.follower_count).where(User.id == author_id)).scalar()
+    if not follower_count or not is_fanout_author(follower_count):
+        return 0
+
+    result = db.execute(
+        insert(TimelineEntry)
+        .from_select(
+            ["user_id", "blog_id", "created_at"],
+            queries.follower_ids(author_id)
+            .join(Blog, Blog.id == blog_id)
+            .add_columns(Blog.id, Blog.created_at)
+        )
+        .on_conflict_do_nothing()
+    )
+    queue_timeline_trim(db, author_id)
+    return result.rowcount
+
+def backfill_timeline(db: Session, user_id, author_id) -> None:
+    """Copy an author's recent posts into a new follower's timeline"""
+    recent = select(Blog.id, Blog.created_at)\
+        .where(Blog.user_id == author_id, Blog.deleted_at.is_(None), Blog.status == BlogStatus.PUBLISHED)\
+        .order_by(Blog.created_at.desc())\
+        .limit(settings.TIMELINE_BACKFILL_POSTS)\
+        .subquery()
+    db.execute(
+        insert(TimelineEntry)
+        .from_select(
+            ["user_id", "blog_id", "created_at"],
+            select(literal(UUID(str(user_id)), TimelineEntry.user_id.type), recent.c.id, recent.c.created_at)
+        )
+        .on_conflict_do_nothing()
+    )
+    trim_timelines(db, select(literal(UUID(str(user_id)), TimelineEntry.user_id.type)))
+
+def remove_author_from_timeline(db: Session, user_id, author_id) -> None:
+    db.execute(
+        delete(TimelineEntry)
+        .where(
+            TimelineEntry.user_id == user_id,
+            TimelineEntry.blog_id.in_(select(Blog.id).where(Blog.user_id == author_id))
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def read_timeline(db: Session, user_id, after: Optional[Tuple[datetime, UUID]], limit: int) -> List[Tuple[datetime, UUID]]:
+    """
+    (created_at, blog_id) of the newest ``limit`` blogs in a user's timeline,
+    newest first, that come after the keyset ``after`` (the last row of the
+    previous page): one range scan of the user's fanned-out entries, merged
+    with the recent posts of any followed read-time authors. Ties on
+    created_at are broken by blog id, so pages never skip or repeat a blog.
+    """
+    streams = [db.execute(queries.timeline_entries(user_id, after, limit)).all()]
+    for author_id in db.execute(queries.read_time_authors(user_id)).scalars().all():
+        streams.append(db.execute(queries.author_posts(author_id, after, limit)).all())
+
+    rows = []
+    seen = set()
+    for created_at, blog_id in heapq.merge(*streams, key=lambda row: (row[0], row[1]), reverse=True):
+        if blog_id in seen:
+            continue
+        seen.add(blog_id)
+        rows.append((created_at, blog_id))
+        if len(rows) == limit:
+            break
+    return rows
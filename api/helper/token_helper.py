@@ -2,16 +2,19 @@ from datetime import datetime, timedelta
 from typing import Union, Any
 from jose import jwt
 from passlib.context import CryptContext
+from api.helper.profiling import timed
 from config import get_settings
 
 settings = get_settings()
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def password_hashing(password: str) -> str:
-    return password_context.hash(password)
+    with timed("bcrypt"):
+        return password_context.hash(password)
 
 def password_verify(password: str, hashed_pass: str) -> bool:
-    return password_context.verify(password, hashed_pass)
+    with timed("bcrypt"):
+        return password_context.verify(password, hashed_pass)
 
 def create_access_token(subject: Union[str, Any], username: str, email: str, role: str, expires_delta: timedelta = None) -> str:
     if expires_delta is not None:
@@ -26,7 +29,8 @@ def create_access_token(subject: Union[str, Any], username: str, email: str, rol
         "email": email,
         "role": role
     }
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
+    with timed("jwt"):
+        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(subject: Union[str, Any], username: str, email: str, role: str, expires_delta: timedelta = None) -> str:
@@ -42,5 +46,6 @@ def create_refresh_token(subject: Union[str, Any], username: str, email: str, ro
         "email": email,
         "role": role
     }
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
+    with timed("jwt"):
+        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
     return encoded_jwt
\ No newline at end of file
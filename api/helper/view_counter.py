@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from sqlalchemy import bindparam, select, update
+from api.db import SessionLocal, get_engine
+from api.helper.hyperloglog import HyperLogLog
+from api.models import Blog
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Buffers blog views in memory and periodically adds them to the blogs
+    table in one transaction: a view count delta plus a HyperLogLog sketch of
+    the viewers, merged into the sketch stored on the blog.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._views: Dict[str, int] = {}
+        self._viewers: Dict[str, HyperLogLog] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, blog_id, viewer_id: str) -> None:
+        key = str(blog_id)
+        with self._lock:
+            self._views[key] = self._views.get(key, 0) + 1
+            sketch = self._viewers.get(key)
+            if sketch is None:
+                sketch = self._viewers[key] = HyperLogLog(settings.VIEW_SKETCH_PRECISION)
+            sketch.add(viewer_id)
+
+    def _drain(self) -> Tuple[Dict[str, int], Dict[str, HyperLogLog]]:
+        with self._lock:
+            views, viewers = self._views, self._viewers
+            self._views, self._viewers = {}, {}
+        return views, viewers
+
+    def flush(self) -> int:
+        """Write buffered views to the database; returns the number of blogs updated"""
+        views, viewers = self._drain()
+        if not views:
+            return 0
+
+        try:
+            with SessionLocal(bind=get_engine()) as db:
+                # Lock in id order so concurrent flushes from other workers cannot deadlock
+                rows = db.execute(
+                    select(Blog.id, Blog.unique_viewers_sketch)
+                    .where(Blog.id.in_(list(views)))
+                    .order_by(Blog.id)
+                    .with_for_update()
+                ).all()
+
+                params = []
+                for blog_id, stored in rows:
+                    key = str(blog_id)
+                    sketch = viewers[key]
+                    if stored:
+                        # Sketches stored at another VIEW_SKETCH_PRECISION are
+                        # folded to the lower one; unreadable ones are dropped
+                        try:
+                            sketch.merge(HyperLogLog.from_bytes(stored))
+                        except ValueError as e:
+                            logger.warning(f"Discarding viewer sketch of blog {key}: {str(e)}")
+                    params.append({
+                        "blog_id": blog_id,
+                        "views": views[key],
+                        "sketch": sketch.to_bytes(),
+                        "unique_views": sketch.count()
+                    })
+
+                if params:
+                    # On the connection: Session.execute would take several parameter
+                    # sets for an ORM bulk update by primary key
+                    db.connection().execute(
+                        update(Blog)
+                        .where(Blog.id == bindparam("blog_id"))
+                        .values(
+                            view_count=Blog.view_count + bindparam("views"),
+                            unique_viewers_sketch=bindparam("sketch"),
+                            unique_view_count=bindparam("unique_views")
+                        )
+                        .execution_options(synchronize_session=False),
+                        params
+                    )
+                db.commit()
+            return len(params)
+
+        except Exception as e:
+            # Keep the views for the next flush rather than losing them
+            logger.error(f"Error flushing blog views: {str(e)}")
+            with self._lock:
+                for key, count in views.items():
+                    self._views[key] = self._views.get(key, 0) + count
+                    sketch = viewers[key]
+                    if key in self._viewers:
+                        sketch.merge(self._viewers[key])
+                    self._viewers[key] = sketch
+            return 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+
+view_counter = ViewCounter(flush_interval=settings.VIEW_FLUSH_SECONDS)
@@ -2,14 +2,24 @@ import uuid
 import enum
 from api.db import Base
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column,DateTime,Text,Boolean,String,Enum,Integer,ForeignKey,ARRAY
+from sqlalchemy.orm import relationship,deferred
+from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY, UUID
+from sqlalchemy import Column,DateTime,Text,Boolean,String,Enum,Integer,BigInteger,LargeBinary,ForeignKey,ARRAY,JSON,Index,text
 
 class UserRole(str,enum.Enum):
     USER = "user"
     ADMIN = "admin"
 
+class JobStatus(str,enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+class BlogStatus(str,enum.Enum):
+    DRAFT = "draft"
+    SCHEDULED = "scheduled"
+    PUBLISHED = "published"
+
 class BaseModel(Base):
     __abstract__=True
     
@@ -32,9 +42,12 @@ class User(BaseModel):
     twitter_url = Column(String(200),nullable=True)
     instagram_url = Column(String(200),nullable=True)
     linkedin_url = Column(String(200),nullable=True)
+    profile_image = Column(String(500),nullable=True)
     role = Column(Enum(UserRole),default=UserRole.USER,nullable=False)
+    follower_count = Column(Integer,default=0,nullable=False)
+    following_count = Column(Integer,default=0,nullable=False)
     
-    blogs = relationship("Blog",back_populates="user",cascade="all,delete-orphan")
+    blogs = relationship("Blog",back_populates="user",cascade="all,delete-orphan",order_by="Blog.created_at.desc()")
     comments = relationship("Comment",back_populates="user")
 
 
@@ -44,14 +57,42 @@ class Blog(BaseModel):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(100), nullable=False)
     description = Column(Text, nullable=False)
+    excerpt = Column(String(300), nullable=True)
     image_url = Column(String(500), nullable=True)
+    # Copies of the author's username and profile image, so blog lists need no
+    # join with users; kept in sync by the "propagate_author" job
+    author_username = Column(String(30), nullable=True)
+    author_avatar_url = Column(String(500), nullable=True)
     like_count = Column(Integer, default=0)
     like_user = Column(ARRAY(String), default=list)
     comment_count = Column(Integer, default=0)
+    # Tag names, mirrored in blog_tags; the GIN index serves tag-filtered feeds
+    # through @> and &&, which only the PostgreSQL ARRAY type provides
+    tags = Column(PG_ARRAY(String(50)), default=list, server_default='{}', nullable=False)
+    view_count = Column(BigInteger, default=0, nullable=False)
+    unique_view_count = Column(Integer, default=0, nullable=False)
+    # HyperLogLog registers of the viewers, only read by the view flusher
+    unique_viewers_sketch = deferred(Column(LargeBinary, nullable=True))
+    # Only published blogs are shown; scheduled ones are published by the
+    # scheduler at publish_at, which then also becomes their created_at
+    status = Column(Enum(BlogStatus), default=BlogStatus.PUBLISHED, server_default=BlogStatus.PUBLISHED.name, nullable=False)
+    publish_at = Column(DateTime(timezone=True), nullable=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     
     user = relationship("User", back_populates="blogs")
     comments = relationship("Comment", back_populates="blog", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Newest-first feed and trending window over live published blogs, so
+        # drafts are never read by feeds; scanned backwards for DESC
+        Index('ix_blogs_live_created','created_at','id',postgresql_where=text("deleted_at IS NULL AND status = 'PUBLISHED'")),
+        # An author's blogs newest first (profiles, timelines, exports) and the users FK;
+        # id breaks created_at ties for the timeline keyset
+        Index('ix_blogs_user_created','user_id','created_at','id'),
+        Index('ix_blogs_tags','tags',postgresql_using='gin'),
+        # Pending scheduled posts by due time, read by the publish scheduler
+        Index('ix_blogs_scheduled_publish_at','publish_at',postgresql_where=text("status = 'SCHEDULED' AND deleted_at IS NULL")),
+    )
     
     
     
@@ -65,10 +106,79 @@ class Comment(BaseModel):
     
     blog = relationship("Blog", back_populates="comments")
     user = relationship("User", back_populates="comments")
-    
-    
-    
-    
-    
-    
-    
\ No newline at end of file
+
+    __table_args__ = (
+        # Comments of a blog in order, and the blogs FK. deleted_at is included
+        # so live comment counts are index-only scans
+        Index('ix_comments_blog_created','blog_id','created_at','id',postgresql_include=['deleted_at']),
+        # A user's comments (moderation, exports) and the users FK
+        Index('ix_comments_user_id','user_id'),
+    )
+
+
+class Tag(Base):
+    __tablename__='tags'
+
+    name = Column(String(50),primary_key=True)
+    # Live blogs carrying the tag, maintained as blogs are tagged, untagged and deleted
+    post_count = Column(Integer,default=0,server_default='0',nullable=False)
+    created_at = Column(DateTime(timezone=True),server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_tags_post_count',post_count.desc(),'name'),
+    )
+
+
+class BlogTag(Base):
+    __tablename__='blog_tags'
+
+    blog_id = Column(UUID(as_uuid=True),ForeignKey('blogs.id',ondelete='CASCADE'),primary_key=True)
+    tag = Column(String(50),ForeignKey('tags.name',ondelete='CASCADE'),primary_key=True)
+
+    __table_args__ = (
+        Index('ix_blog_tags_tag','tag','blog_id'),
+    )
+
+
+class Follow(Base):
+    __tablename__='follows'
+
+    follower_id = Column(UUID(as_uuid=True),ForeignKey('users.id',ondelete='CASCADE'),primary_key=True)
+    followee_id = Column(UUID(as_uuid=True),ForeignKey('users.id',ondelete='CASCADE'),primary_key=True)
+    created_at = Column(DateTime(timezone=True),server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_follows_followee_id','followee_id','follower_id'),
+    )
+
+
+class TimelineEntry(Base):
+    """A blog pushed into a follower's personal timeline (fan-out on write)"""
+    __tablename__='timeline_entries'
+
+    user_id = Column(UUID(as_uuid=True),ForeignKey('users.id',ondelete='CASCADE'),primary_key=True)
+    blog_id = Column(UUID(as_uuid=True),ForeignKey('blogs.id',ondelete='CASCADE'),primary_key=True)
+    created_at = Column(DateTime(timezone=True),nullable=False)
+
+    __table_args__ = (
+        # A timeline newest first, in (created_at, blog_id) keyset order
+        Index('ix_timeline_entries_user_created','user_id',created_at.desc(),blog_id.desc()),
+        # Deleting a blog cascades to the timelines it was pushed into
+        Index('ix_timeline_entries_blog_id','blog_id'),
+    )
+
+
+class Job(BaseModel):
+    __tablename__='jobs'
+
+    id = Column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
+    kind = Column(String(50),nullable=False)
+    payload = Column(JSON,nullable=False,default=dict)
+    status = Column(Enum(JobStatus),default=JobStatus.PENDING,nullable=False)
+    attempts = Column(Integer,default=0,nullable=False)
+    run_at = Column(DateTime(timezone=True),server_default=func.now(),nullable=False)
+    last_error = Column(Text,nullable=True)
+
+    __table_args__ = (
+        Index('ix_jobs_pending_run_at','run_at',postgresql_where=(status == JobStatus.PENDING)),
+    )
@@ -0,0 +1,169 @@
+"""
+Statements behind the routes and background jobs. Routes and helpers build
+their queries here, and the plan checks (``python -m api.cli.check_plans``
+and tests/test_query_plans.py) EXPLAIN these same statements, so a query
+and its index can only change together.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import Select
+from api.models import Blog, BlogStatus, Comment, Follow, Job, JobStatus, Tag, TimelineEntry, User
+from config import get_settings
+
+settings = get_settings()
+
+# (created_at, id) of the last row of the previous page
+Keyset = Tuple[datetime, UUID]
+
+
+def live_blogs():
+    """Blogs shown in feeds, profiles and timelines: published and not deleted"""
+    return and_(Blog.deleted_at.is_(None), Blog.status == BlogStatus.PUBLISHED)
+
+
+def blog_feed(tags: Optional[List[str]] = None, match: str = "all", after: Optional[Keyset] = None,
+              skip: int = 0, limit: int = 10) -> Select:
+    """GET /blogs/: newest live blogs, by keyset ``after`` or by offset"""
+    statement = select(Blog).where(live_blogs())
+    if tags:
+        # Both operators are served by the GIN index on blogs.tags
+        statement = statement.where(Blog.tags.contains(tags) if match == "all" else Blog.tags.overlap(tags))
+    if after is not None:
+        statement = statement.where(tuple_(Blog.created_at, Blog.id) < tuple_(*after))
+    elif skip:
+        statement = statement.offset(skip)
+    return statement.order_by(Blog.created_at.desc(), Blog.id.desc()).limit(limit)
+
+
+def trending_score():
+    """
+    (unique viewers + TRENDING_VIEW_WEIGHT * views + 3 * likes + 5 * comments)
+    / (age in hours + 2) ^ TRENDING_GRAVITY
+    """
+    age_hours = func.extract("epoch", func.now() - Blog.created_at) / 3600
+    return (
+        Blog.unique_view_count + settings.TRENDING_VIEW_WEIGHT * Blog.view_count
+        + 3 * func.coalesce(Blog.like_count, 0) + 5 * func.coalesce(Blog.comment_count, 0)
+    ) / func.power(age_hours + 2, settings.TRENDING_GRAVITY)
+
+
+def trending_blogs(since: datetime, limit: int) -> Select:
+    """GET /blogs/trending: live blogs created since ``since``, best score first"""
+    return select(Blog)\
+        .where(Blog.created_at >= since, live_blogs())\
+        .order_by(trending_score().desc())\
+        .limit(limit)
+
+
+def blog_by_id(blog_id, published_only: bool = True) -> Select:
+    """A blog that is not deleted; drafts and scheduled ones unless ``published_only``"""
+    statement = select(Blog).where(Blog.id == blog_id, Blog.deleted_at.is_(None))
+    if published_only:
+        statement = statement.where(Blog.status == BlogStatus.PUBLISHED)
+    return statement
+
+
+def draft_blogs(user_id) -> Select:
+    """GET /blogs/drafts: a user's unpublished blogs, scheduled ones by publish time, then drafts"""
+    return select(Blog)\
+        .where(Blog.user_id == user_id, Blog.deleted_at.is_(None), Blog.status != BlogStatus.PUBLISHED)\
+        .order_by(Blog.publish_at.asc().nulls_last(), Blog.created_at.desc())
+
+
+def profile(user_id, blog_columns: list, active_only: bool = False) -> Select:
+    """A user joined with their live blogs, limited to ``blog_columns``"""
+    statement = select(User)\
+        .options(joinedload(User.blogs.and_(live_blogs())).load_only(*blog_columns))\
+        .where(User.id == user_id)
+    if active_only:
+        statement = statement.where(User.is_active == True)
+    return statement
+
+
+def tag_cloud(limit: int) -> Select:
+    """GET /tags/: the most used tags, from the top of the post_count index"""
+    return select(Tag.name, Tag.post_count)\
+        .where(Tag.post_count > 0)\
+        .order_by(Tag.post_count.desc(), Tag.name)\
+        .limit(limit)
+
+
+def comments_page(blog_id, skip: int, limit: int) -> Select:
+    """GET /blogs/{blog_id}/comments/: live comments with their author's username, oldest first"""
+    return select(Comment, User.username)\
+        .join(User)\
+        .where(Comment.blog_id == blog_id, Comment.deleted_at.is_(None))\
+        .order_by(Comment.created_at, Comment.id)\
+        .offset(skip)\
+        .limit(limit)
+
+
+def live_comment_count(blog_id) -> Select:
+    """Number of live comments of a blog (``blog_id`` may be Blog.id, to correlate)"""
+    return select(func.count()).where(Comment.blog_id == blog_id, Comment.deleted_at.is_(None))
+
+
+def user_comment_ids(user_id, limit: int) -> Select:
+    """Up to ``limit`` of a user's live comments, a chunk for moderation"""
+    return select(Comment.id).where(Comment.user_id == user_id, Comment.deleted_at.is_(None)).limit(limit)
+
+
+def follower_ids(author_id) -> Select:
+    """Followers of an author, for fan-out"""
+    return select(Follow.follower_id).where(Follow.followee_id == author_id)
+
+
+def read_time_authors(user_id) -> Select:
+    """Authors a user follows whose posts are merged into timelines when read"""
+    return select(Follow.followee_id)\
+        .join(User, User.id == Follow.followee_id)\
+        .where(Follow.follower_id == user_id, User.follower_count >= settings.TIMELINE_FANOUT_MAX_FOLLOWERS)
+
+
+def timeline_entries(user_id, after: Optional[Keyset], limit: int) -> Select:
+    """(created_at, blog_id) of a user's fanned-out timeline entries, newest first"""
+    statement = select(TimelineEntry.created_at, TimelineEntry.blog_id).where(TimelineEntry.user_id == user_id)
+    if after is not None:
+        statement = statement.where(tuple_(TimelineEntry.created_at, TimelineEntry.blog_id) < tuple_(*after))
+    return statement.order_by(TimelineEntry.created_at.desc(), TimelineEntry.blog_id.desc()).limit(limit)
+
+
+def author_posts(author_id, after: Optional[Keyset], limit: int) -> Select:
+    """(created_at, id) of an author's live blogs, newest first"""
+    statement = select(Blog.created_at, Blog.id).where(Blog.user_id == author_id, live_blogs())
+    if after is not None:
+        statement = statement.where(tuple_(Blog.created_at, Blog.id) < tuple_(*after))
+    return statement.order_by(Blog.created_at.desc(), Blog.id.desc()).limit(limit)
+
+
+def user_by_email(email: str) -> Select:
+    return select(User).where(User.email == email)
+
+
+def due_scheduled_blogs(limit: int) -> Select:
+    """Ids of up to ``limit`` due scheduled blogs, claimed with SKIP LOCKED"""
+    return select(Blog.id)\
+        .where(Blog.status == BlogStatus.SCHEDULED, Blog.deleted_at.is_(None), Blog.publish_at <= func.now())\
+        .order_by(Blog.publish_at)\
+        .limit(limit)\
+        .with_for_update(skip_locked=True)
+
+
+def scheduled_publish_times(limit: int) -> Select:
+    """The next ``limit`` publish times, from the pending-posts index"""
+    return select(Blog.publish_at)\
+        .where(Blog.status == BlogStatus.SCHEDULED, Blog.deleted_at.is_(None))\
+        .order_by(Blog.publish_at)\
+        .limit(limit)
+
+
+def due_jobs(limit: int) -> Select:
+    """Ids of up to ``limit`` due pending jobs, claimed with SKIP LOCKED"""
+    return select(Job.id)\
+        .where(Job.status == JobStatus.PENDING, Job.run_at <= func.now())\
+        .order_by(Job.run_at)\
+        .limit(limit)\
+        .with_for_update(skip_locked=True)
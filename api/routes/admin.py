@@ -0,0 +1,178 @@
+import asyncio
+import itertools
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from api.db import get_db
+from api.models import User
+from api.helper.current_user import CurrentUser, get_current_user
+from api.helper.jobs import job_worker, queue_depth
+from api.helper.publishing import publish_scheduler
+from api.helper.moderation import count_matching_comments, deactivate_user, purge_comments
+from api.helper.profiling import profiler
+from api.helper.read_cache import blog_read_cache
+from config import get_settings
+from typing import Iterator
+from uuid import UUID
+
+settings = get_settings()
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"]
+)
+
+async def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+@router.get("/jobs", response_model=dict)
+async def get_job_metrics(admin: CurrentUser = Depends(require_admin)):
+    """
+    Background job metrics
+    - queue: jobs per status in the jobs table (pending, running, failed)
+    - worker: results handled by this worker process since it started
+    - scheduler: scheduled blogs published by this worker process since it started
+    """
+    try:
+        return {
+            "queue": await asyncio.to_thread(queue_depth),
+            "worker": job_worker.stats,
+            "scheduler": publish_scheduler.stats
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching job metrics: {str(e)}"
+        )
+
+@router.get("/read-cache", response_model=dict)
+async def get_read_cache_metrics(admin: CurrentUser = Depends(require_admin)):
+    """
+    Blog read cache of this worker: hits and misses, fetches executed,
+    requests coalesced onto another request's fetch, and fetch errors
+    """
+    return blog_read_cache.metrics()
+
+async def progress_response(records: Iterator[dict], error_status: int) -> StreamingResponse:
+    """
+    Stream progress records of a bulk operation as NDJSON, one line per chunk.
+    The first chunk runs before the response starts, so when it fails the
+    request fails with ``error_status``; a later failure can only end the
+    stream with an "error" record.
+    """
+    first = await asyncio.to_thread(next, records, None)
+    if first is None or first["step"] == "error":
+        records.close()
+        raise HTTPException(
+            status_code=error_status,
+            detail=first["detail"] if first else "Operation produced no result"
+        )
+    return StreamingResponse(
+        (orjson.dumps(record) + b"\n" for record in itertools.chain([first], records)),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/users/{user_id}/deactivate")
+async def deactivate_user_account(
+    user_id: UUID,
+    db: Session = Depends(get_db),
+    admin: CurrentUser = Depends(require_admin)
+):
+    """
+    Deactivate a user and soft-delete all their blogs and comments, removing
+    their likes. Runs as chunked set-based updates, each chunk committed on
+    its own, and streams NDJSON progress records; the last one has step
+    "done" with the totals, or step "error" if a later chunk failed. An
+    interrupted deactivation can be run again to finish it.
+    """
+    if str(user_id) == admin.sub:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot deactivate yourself"
+        )
+    if not db.query(User.id).filter(User.id == user_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return await progress_response(deactivate_user(user_id), status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@router.post("/comments/purge")
+async def purge_matching_comments(
+    pattern: str = Query(..., min_length=3, description="Text to match, case-insensitive"),
+    regex: bool = Query(False, description="Treat pattern as a POSIX regular expression"),
+    dry_run: bool = Query(False, description="Only count the matching comments"),
+    db: Session = Depends(get_db),
+    admin: CurrentUser = Depends(require_admin)
+):
+    """
+    Delete every comment matching a pattern and fix up the blogs' comment
+    counts. With dry_run only the number of matches is returned; otherwise
+    NDJSON progress records are streamed as for user deactivation.
+    """
+    if dry_run:
+        try:
+            return {"matching": count_matching_comments(db, pattern, regex)}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error matching comments: {str(e)}"
+            )
+    return await progress_response(purge_comments(pattern, regex), status.HTTP_400_BAD_REQUEST)
+
+@router.get("/profile", response_model=dict)
+async def get_profile_report(admin: CurrentUser = Depends(require_admin)):
+    """
+    Per-route timings of sampled requests in this worker: average and max
+    latency, and the average time spent in db, serialization, jwt, bcrypt
+    and everything else, plus the profiler's own overhead per request
+    """
+    return profiler.report()
+
+@router.put("/profile/sample-rate", response_model=dict)
+async def set_profile_sample_rate(
+    rate: float = Query(..., ge=0, le=1, description="Fraction of requests to profile"),
+    admin: CurrentUser = Depends(require_admin)
+):
+    """Change the sampling rate of this worker until it restarts"""
+    profiler.sample_rate = rate
+    return {"sample_rate": rate}
+
+@router.delete("/profile", response_model=dict)
+async def reset_profile_report(admin: CurrentUser = Depends(require_admin)):
+    profiler.reset()
+    return {"message": "Profile statistics reset"}
+
+@router.post("/profile/capture", response_model=dict)
+async def capture_profile(
+    seconds: float = Query(10, gt=0, description="Capture duration in seconds"),
+    admin: CurrentUser = Depends(require_admin)
+):
+    """
+    Sample the stacks of this worker's busy threads for the given time and
+    write a wall-clock collapsed-stack file (for flamegraph.pl or speedscope)
+    to PROFILE_OUTPUT_DIR; returns its path and the sampling overhead
+    """
+    if seconds > settings.PROFILE_MAX_CAPTURE_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Captures are limited to {settings.PROFILE_MAX_CAPTURE_SECONDS} seconds"
+        )
+    try:
+        return await asyncio.to_thread(profiler.capture, seconds)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error capturing profile: {str(e)}"
+        )
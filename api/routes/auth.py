@@ -1,11 +1,13 @@
 from fastapi import APIRouter,Depends,HTTPException,status
 from api.schemas.auth import SignUpRequest, SignUpResponse,Token,Login
 from sqlalchemy.orm import Session
+from api import queries
 from api.db import get_db
 from api.models import User
 from api.helper.token_helper import password_hashing,password_verify,create_access_token,create_refresh_token
 from datetime import timedelta
 from config import get_settings
+import logging
 
 router = APIRouter(
     prefix="/auth",
@@ -13,12 +15,13 @@ router = APIRouter(
     )
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 @router.post('/signup', response_model=SignUpResponse)
 async def signup(user_data: SignUpRequest, db: Session = Depends(get_db)):
     try:
         # Check existing user
-        if db.query(User).filter(User.email == user_data.email).first():
+        if db.execute(queries.user_by_email(user_data.email)).scalars().first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -51,13 +54,10 @@ async def signup(user_data: SignUpRequest, db: Session = Depends(get_db)):
         )
 
         # Save to database
-        print("Attempting to save user to database...")
         db.add(user)
-        db.flush()  # Flush to get the ID without committing
-        print(f"User ID generated: {user.id}")
         db.commit()
         db.refresh(user)
-        print("User saved successfully")
+        logger.info("User signed up", extra={"user_id": str(user.id)})
 
         return SignUpResponse(
             message="User registered successfully. Please login to get access token.",
@@ -66,7 +66,7 @@ async def signup(user_data: SignUpRequest, db: Session = Depends(get_db)):
 
     except Exception as error:
         db.rollback()
-        print(f"Error in signup: {str(error)}")
+        logger.error(f"Error in signup: {str(error)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating user: {str(error)}"
@@ -74,7 +74,7 @@ async def signup(user_data: SignUpRequest, db: Session = Depends(get_db)):
 
 @router.post('/login', response_model=Token)
 async def login(user_data: Login, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = db.execute(queries.user_by_email(user_data.email)).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
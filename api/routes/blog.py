@@ -1,73 +1,163 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from api.db import get_db
-from api.models import Blog, User, UserRole
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, load_only
+from api import queries
+from api.db import SessionLocal, get_db, get_read_db, has_recent_write
+from api.models import Blog, BlogStatus, User, UserRole
 from api.schemas.blog import BlogCreate, BlogUpdate, BlogResponse
 from api.helper.auth_bearer import verify_token
+from api.helper.current_user import CurrentUser, get_current_user
 from api.helper.cloudinary_helper import upload_image, delete_image
-from typing import List, Optional
+from api.helper.jobs import enqueue, job_worker
+from api.helper.like_cache import remember_like, cached_like_statuses
+from api.helper.publishing import publish_blog, publish_scheduler, resolve_publication
+from api.helper.read_cache import blog_read_cache
+from api.helper.serializers import ModelSerializer, blog_serializer, blog_summary_serializer
+from api.helper.tags import decode_cursor, encode_cursor, normalize_tags, release_blog_tags, set_blog_tags
+from api.helper.text_helper import make_excerpt
+from api.helper.view_counter import view_counter
+from config import get_settings
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 from uuid import UUID
 
+settings = get_settings()
+
 router = APIRouter(
     prefix="/blogs",
     tags=["blogs"]
 )
 
-async def check_blog_permission(blog_id: UUID, user_data: dict, db: Session):
-    """Check if user has permission to modify the blog"""
-    try:
-        blog = db.query(Blog).filter(Blog.id == blog_id).first()
-        if not blog:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Blog not found"
-            )
-        print("tokne--->",user_data.get("sub"),"     ",str(blog.user_id))
-        # Check if user is admin or blog owner
-        is_admin = user_data.get("role") == "admin"
-        is_owner = str(blog.user_id) == user_data.get("sub")
-        
-        if not (is_admin or is_owner):
+def load_like_statuses(db: Session, user_id: str, blog_ids: List[UUID]) -> Dict[str, dict]:
+    """
+    Like status of several blogs for one user in a single primary-key lookup.
+    Membership is tested in the database so the like_user arrays are never
+    shipped to the app; statuses already in the recently-liked cache skip it.
+    """
+    cached = cached_like_statuses(user_id, blog_ids)
+    if all(liked is not None for liked in cached.values()):
+        rows = db.query(Blog.id, Blog.like_count).filter(Blog.id.in_(blog_ids), Blog.deleted_at.is_(None), Blog.status == BlogStatus.PUBLISHED).all()
+        return {
+            str(row.id): {"liked": cached[str(row.id)], "like_count": row.like_count}
+            for row in rows
+        }
+
+    rows = db.query(
+        Blog.id,
+        Blog.like_count,
+        Blog.like_user.any(user_id).label("liked")
+    ).filter(Blog.id.in_(blog_ids), Blog.deleted_at.is_(None), Blog.status == BlogStatus.PUBLISHED).all()
+
+    statuses = {}
+    for row in rows:
+        liked = bool(row.liked)
+        remember_like(user_id, row.id, liked)
+        statuses[str(row.id)] = {"liked": liked, "like_count": row.like_count}
+    return statuses
+
+def select_blog_serializer(view: str, fields: Optional[str], liked_by_me: bool = False) -> ModelSerializer:
+    """Serializer for the requested list view or explicit field selection"""
+    if fields:
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = names - set(blog_serializer.field_names)
+        if unknown:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to modify this blog. Only the blog owner or admin can modify it."
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
             )
-        
-        return blog
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+        names.add("id")
+        if liked_by_me:
+            names.add("liked_by_me")
+        return blog_serializer.only(names)
+
+    if view == "summary":
+        return blog_summary_serializer
+    return blog_serializer
+
+def blog_columns(serializer: ModelSerializer) -> list:
+    """Blog columns backing a serializer, for load_only()"""
+    return [getattr(Blog, name) for name in serializer.field_names if name in Blog.__table__.c]
+
+def get_blog_or_404(db: Session, blog_id: UUID, published_only: bool = True) -> Blog:
+    """Live blog by id; drafts and scheduled blogs only when published_only is off"""
+    blog = db.execute(queries.blog_by_id(blog_id, published_only)).scalars().first()
+    if not blog:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error checking blog permissions: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blog not found"
+        )
+    return blog
+
+def check_blog_permission(blog: Blog, current_user: CurrentUser) -> Blog:
+    """Check if user has permission to modify the already loaded blog"""
+    # Check if user is admin or blog owner
+    is_owner = str(blog.user_id) == current_user.sub
+    
+    if not (current_user.is_admin or is_owner):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to modify this blog. Only the blog owner or admin can modify it."
         )
+    
+    return blog
 
 @router.post("/", response_model=BlogResponse)
 async def create_blog(
     title: str,
     description: str,
     image: Optional[UploadFile] = File(None),
+    tags: List[str] = Query([], description="Tags (repeat or comma-separate)"),
+    blog_status: Optional[BlogStatus] = Query(None, alias="status", description="draft, scheduled or published (default, or scheduled when publish_at is set)"),
+    publish_at: Optional[datetime] = Query(None, description="When a scheduled blog is published"),
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    """
+    Create a blog. Published blogs appear in feeds right away; drafts and
+    scheduled blogs are only visible to their author under /blogs/drafts
+    until they are published, scheduled ones at publish_at.
+    """
+    tags = normalize_tags(tags)
+    blog_status, publish_at = resolve_publication(blog_status, publish_at)
     try:
         # Handle image upload if provided
         image_url = None
         if image:
             image_url = await upload_image(image)
         
+        # The author summary is read from the users row rather than the cached
+        # identity, under a share lock: a concurrent username/avatar change
+        # waits for this blog, so its propagate_author job sees it
+        author = db.query(User.username, User.profile_image)\
+            .filter(User.id == current_user.sub)\
+            .with_for_update(read=True)\
+            .one()
         blog = Blog(
             title=title,
             description=description,
+            excerpt=make_excerpt(description),
             image_url=image_url,
-            user_id=token_data["sub"]
+            user_id=current_user.sub,
+            author_username=author.username,
+            author_avatar_url=author.profile_image,
+            status=blog_status,
+            publish_at=publish_at
         )
         
         db.add(blog)
+        db.flush()
+        if tags:
+            set_blog_tags(db, blog, tags)
+        # Followers' timelines are filled in the background once the blog is published
+        if blog_status == BlogStatus.PUBLISHED:
+            enqueue(db, "fanout_blog", blog_id=str(blog.id), author_id=current_user.sub)
         db.commit()
+        job_worker.notify()
+        if publish_at:
+            publish_scheduler.schedule(publish_at)
         db.refresh(blog)
-        return blog
+        return blog_serializer.response(blog)
         
     except Exception as e:
         if 'image_url' in locals() and image_url:
@@ -82,25 +172,169 @@ async def create_blog(
 async def get_blogs(
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    liked_by_me: bool = False,
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns the excerpt instead of the full description"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    tag: Optional[List[str]] = Query(None, description="Only blogs with these tags (repeat or comma-separate)"),
+    match: str = Query("all", pattern="^(all|any)$", description="all: blogs with every tag, any: blogs with at least one"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page, instead of skip"),
+    db: Session = Depends(get_read_db),
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Newest blogs first. Pages can be fetched with skip/limit or, cheaper for
+    deep pages, by passing the X-Next-Cursor header of the previous page as
+    cursor; the header is only set when more blogs may follow.
+    """
+    # Only the columns the response needs are read, so summary pages never
+    # touch the description text
+    serializer = select_blog_serializer(view, fields, liked_by_me)
+    columns = blog_columns(serializer) + [Blog.created_at]
+    tags = normalize_tags(tag)
+
+    # Compute the current user's like status in the same query instead of
+    # loading every like_user array
+    current_user_id = str(token_data["sub"])
+    after = decode_cursor(cursor) if cursor else None
+    statement = queries.blog_feed(tags, match, after, skip, limit).options(load_only(*columns))
+    if liked_by_me:
+        rows = db.execute(statement.add_columns(Blog.like_user.any(current_user_id))).all()
+    else:
+        rows = db.execute(statement).scalars().all()
+
+    blogs = []
+    for row in rows:
+        if liked_by_me:
+            blog, liked = row
+            setattr(blog, 'liked_by_me', bool(liked))
+            remember_like(current_user_id, blog.id, bool(liked))
+        else:
+            blog = row
+        blogs.append(blog)
+
+    response = serializer.response(blogs, many=True)
+    if blogs and len(blogs) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(blogs[-1].created_at, blogs[-1].id)
+    return response
+
+@router.get("/like-status", response_model=dict)
+async def get_blogs_like_status(
+    ids: str = Query(..., description="Comma-separated blog ids"),
+    db: Session = Depends(get_read_db),
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Get the like status of several blogs for the current user
+    Returns a mapping of blog id to:
+    - liked: boolean indicating if current user has liked the blog
+    - like_count: total number of likes
+    Unknown blog ids are left out of the mapping.
+    """
+    try:
+        blog_ids = list(dict.fromkeys(UUID(blog_id.strip()) for blog_id in ids.split(",") if blog_id.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of blog ids"
+        )
+
+    if not blog_ids:
+        return {}
+    if len(blog_ids) > settings.LIKE_STATUS_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.LIKE_STATUS_MAX_IDS} blog ids can be requested at once"
+        )
+
+    try:
+        return load_like_statuses(db, str(token_data["sub"]), blog_ids)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting blog like status: {str(e)}"
+        )
+
+@router.get("/trending", response_model=List[BlogResponse])
+async def get_trending_blogs(
+    limit: int = Query(10, ge=1, le=50),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns the excerpt instead of the full description"),
+    db: Session = Depends(get_read_db),
     token_data: dict = Depends(verify_token)
 ):
-    blogs = db.query(Blog).offset(skip).limit(limit).all()
-    return blogs
+    """
+    Blogs of the last TRENDING_WINDOW_DAYS ranked by engagement decayed by age:
+    (unique viewers + TRENDING_VIEW_WEIGHT * views + 3 * likes + 5 * comments)
+    / (age in hours + 2) ^ TRENDING_GRAVITY. Unique viewers carry the reach;
+    total views add a smaller weight for blogs people come back to.
+    """
+    serializer = select_blog_serializer(view, None)
+    since = datetime.now(timezone.utc) - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+
+    try:
+        blogs = db.execute(
+            queries.trending_blogs(since, limit).options(load_only(*blog_columns(serializer)))
+        ).scalars().all()
+        return serializer.response(blogs, many=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching trending blogs: {str(e)}"
+        )
+
+@router.get("/drafts", response_model=List[BlogResponse])
+async def get_draft_blogs(
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns the excerpt instead of the full description"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """The current user's unpublished blogs: scheduled ones by publish time, then drafts"""
+    serializer = select_blog_serializer(view, None)
+    try:
+        blogs = db.execute(
+            queries.draft_blogs(current_user.sub).options(load_only(*blog_columns(serializer)))
+        ).scalars().all()
+        return serializer.response(blogs, many=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching drafts: {str(e)}"
+        )
+
+def fetch_blog_payload(engine: Engine, blog_id: UUID) -> Optional[bytes]:
+    """Serialized blog for GET /blogs/{blog_id}, None if there is no such blog"""
+    with SessionLocal(bind=engine) as db:
+        blog = db.execute(queries.blog_by_id(blog_id)).scalars().first()
+        return orjson.dumps(blog_serializer.to_dict(blog)) if blog else None
 
 @router.get("/{blog_id}", response_model=BlogResponse)
 async def get_blog(
     blog_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
     token_data: dict = Depends(verify_token)
 ):
-    blog = db.query(Blog).filter(Blog.id == blog_id).first()
-    if not blog:
+    """
+    Get a blog. Concurrent requests for the same blog share one fetch and
+    serialization, whose result is cached for READ_CACHE_TTL_SECONDS; a
+    client that wrote recently reads it from the primary instead.
+    """
+    try:
+        payload = await blog_read_cache.get(
+            str(blog_id), "blog",
+            lambda engine: fetch_blog_payload(engine, blog_id),
+            primary=has_recent_write(request)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching blog: {str(e)}"
+        )
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Blog not found"
         )
-    return blog
+    view_counter.record(blog_id, str(token_data["sub"]))
+    return Response(content=payload, media_type="application/json")
 
 @router.put("/{blog_id}", response_model=BlogResponse)
 async def update_blog(
@@ -108,15 +342,20 @@ async def update_blog(
     title: str = Form(None, description="Updated blog title"),
     description: str = Form(None, description="Updated blog description"),
     image: UploadFile = File(None, description="Updated blog image"),
+    tags: str = Form(None, description="Comma-separated tags replacing the current ones; empty removes all"),
+    blog_status: Optional[BlogStatus] = Form(None, alias="status", description="draft, scheduled or published"),
+    publish_at: Optional[datetime] = Form(None, description="When a scheduled blog is published"),
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Update a blog post. Only the blog owner or admin can update it.
+    Drafts and scheduled blogs can be published, scheduled or turned back
+    into drafts; published blogs stay published.
     """
     try:
         # First check permission
-        blog = await check_blog_permission(blog_id, token_data, db)
+        blog = check_blog_permission(get_blog_or_404(db, blog_id, published_only=False), current_user)
         
         # Track if any changes were made
         changes_made = False
@@ -133,8 +372,26 @@ async def update_blog(
             
         if description is not None and description.strip():
             blog.description = description.strip()
+            blog.excerpt = make_excerpt(blog.description)
             changes_made = True
             
+        if tags is not None:
+            set_blog_tags(db, blog, normalize_tags([tags]))
+            changes_made = True
+
+        if blog_status is not None or publish_at is not None:
+            if blog.status == BlogStatus.PUBLISHED:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Published blogs cannot be unpublished or rescheduled"
+                )
+            new_status, blog.publish_at = resolve_publication(blog_status, publish_at)
+            if new_status == BlogStatus.PUBLISHED:
+                publish_blog(db, blog)
+            else:
+                blog.status = new_status
+            changes_made = True
+
         # Handle image upload if provided
         if image and image.filename:
             # Validate image
@@ -144,12 +401,12 @@ async def update_blog(
                     detail="File must be an image"
                 )
                 
-            # Delete old image if exists
-            if blog.image_url:
-                await delete_image(blog.image_url)
-                
-            # Upload new image
+            # Upload new image, the old one is deleted in the background
+            # once the update is committed
+            old_image_url = blog.image_url
             blog.image_url = await upload_image(image)
+            if old_image_url:
+                enqueue(db, "delete_image", image_url=old_image_url)
             changes_made = True
             
         if not changes_made:
@@ -159,8 +416,12 @@ async def update_blog(
             )
             
         db.commit()
+        blog_read_cache.invalidate(str(blog_id))
+        job_worker.notify()
         db.refresh(blog)
-        return blog
+        if blog.publish_at and blog.status == BlogStatus.SCHEDULED:
+            publish_scheduler.schedule(blog.publish_at)
+        return blog_serializer.response(blog)
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -176,17 +437,21 @@ async def update_blog(
 async def delete_blog(
     blog_id: UUID,
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    blog = await check_blog_permission(blog_id, token_data, db)
+    blog = check_blog_permission(get_blog_or_404(db, blog_id, published_only=False), current_user)
     
     try:
-        # Delete image from Cloudinary if exists
+        # Delete image from Cloudinary in the background once the blog is gone
         if blog.image_url:
-            await delete_image(blog.image_url)
-            
+            enqueue(db, "delete_image", image_url=blog.image_url)
+
+        if blog.status == BlogStatus.PUBLISHED:
+            release_blog_tags(db, [blog.tags])
         db.delete(blog)
         db.commit()
+        blog_read_cache.invalidate(str(blog_id))
+        job_worker.notify()
         return {"message": "Blog deleted successfully"}
         
     except Exception as e:
@@ -200,7 +465,7 @@ async def delete_blog(
 async def toggle_like_blog(
     blog_id: UUID,
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Toggle like/unlike for a blog post.
@@ -209,33 +474,34 @@ async def toggle_like_blog(
     """
     try:
         # Get the blog
-        blog = db.query(Blog).filter(Blog.id == blog_id).first()
-        if not blog:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Blog not found"
-            )
+        blog = get_blog_or_404(db, blog_id)
         
         # Get current user's ID
-        current_user_id = str(token_data["sub"])
+        current_user_id = current_user.sub
         
         # Initialize like_user list if None
         if blog.like_user is None:
             blog.like_user = []
         
-        # Check if user has already liked
+        # Check if user has already liked. The array is reassigned rather than
+        # mutated in place, otherwise SQLAlchemy never flushes the change
         if current_user_id in blog.like_user:
             # Unlike: Remove user and decrease count
-            blog.like_user.remove(current_user_id)
+            blog.like_user = [user_id for user_id in blog.like_user if user_id != current_user_id]
             blog.like_count = max(0, blog.like_count - 1)  # Ensure count doesn't go below 0
         else:
             # Like: Add user and increase count
-            blog.like_user.append(current_user_id)
+            blog.like_user = blog.like_user + [current_user_id]
             blog.like_count = blog.like_count + 1
         
         db.commit()
+        blog_read_cache.invalidate(str(blog_id))
         db.refresh(blog)
-        return blog
+
+        liked = current_user_id in (blog.like_user or [])
+        remember_like(current_user_id, blog.id, liked)
+        setattr(blog, 'liked_by_me', liked)
+        return blog_serializer.response(blog)
         
     except HTTPException:
         raise
@@ -250,7 +516,7 @@ async def toggle_like_blog(
 @router.get("/{blog_id}/like-status", response_model=dict)
 async def get_blog_like_status(
     blog_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     token_data: dict = Depends(verify_token)
 ):
     """
@@ -260,20 +526,14 @@ async def get_blog_like_status(
     - like_count: total number of likes
     """
     try:
-        blog = db.query(Blog).filter(Blog.id == blog_id).first()
-        if not blog:
+        like_status = load_like_statuses(db, str(token_data["sub"]), [blog_id]).get(str(blog_id))
+        if not like_status:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Blog not found"
             )
         
-        current_user_id = str(token_data["sub"])
-        is_liked = current_user_id in (blog.like_user or [])
-        
-        return {
-            "liked": is_liked,
-            "like_count": blog.like_count
-        }
+        return like_status
         
     except HTTPException:
         raise
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from api.db import get_db
-from api.models import Comment, Blog, User
+from api import queries
+from api.db import SessionLocal, get_db, has_recent_write
+from api.models import Comment, Blog, BlogStatus
 from api.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
 from api.helper.auth_bearer import verify_token
+from api.helper.current_user import CurrentUser, get_current_user
+from api.helper.jobs import enqueue, job_worker
+from api.helper.read_cache import blog_read_cache
+from api.helper.serializers import comment_serializer
 from typing import List
 from uuid import UUID
 
@@ -17,12 +24,12 @@ async def create_comment(
     blog_id: UUID,
     comment_data: CommentCreate,
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new comment on a blog post"""
     try:
         # Check if blog exists
-        blog = db.query(Blog).filter(Blog.id == blog_id).first()
+        blog = db.query(Blog).filter(Blog.id == blog_id, Blog.deleted_at.is_(None), Blog.status == BlogStatus.PUBLISHED).first()
         if not blog:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -33,20 +40,21 @@ async def create_comment(
         comment = Comment(
             comment=comment_data.comment,
             blog_id=blog_id,
-            user_id=token_data["sub"]
+            user_id=current_user.sub
         )
         
-        # Update blog's comment count
-        blog.comment_count += 1
-        
         db.add(comment)
+        # The blog's comment count is recomputed in the background
+        enqueue(db, "reconcile_blog_counters", blog_id=str(blog_id))
         db.commit()
+        job_worker.notify()
+        blog_read_cache.invalidate(str(blog_id))
         db.refresh(comment)
         
         # Add user_name to response
-        setattr(comment, 'user_name', token_data["username"])
+        setattr(comment, 'user_name', current_user.username)
         
-        return comment
+        return comment_serializer.response(comment)
         
     except HTTPException:
         raise
@@ -57,28 +65,38 @@ async def create_comment(
             detail=f"Error creating comment: {str(e)}"
         )
 
+def fetch_comments_payload(engine: Engine, blog_id: UUID, skip: int, limit: int) -> bytes:
+    """Serialized comment page for GET /blogs/{blog_id}/comments/"""
+    with SessionLocal(bind=engine) as db:
+        rows = db.execute(queries.comments_page(blog_id, skip, limit)).all()
+
+        # Add user_name to each comment
+        comments = []
+        for comment, username in rows:
+            setattr(comment, 'user_name', username)
+            comments.append(comment)
+        return orjson.dumps(comment_serializer.to_list(comments))
+
 @router.get("/", response_model=List[CommentResponse])
 async def get_blog_comments(
     blog_id: UUID,
+    request: Request,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
     token_data: dict = Depends(verify_token)
 ):
-    """Get all comments for a blog post"""
+    """
+    Get all comments for a blog post. Concurrent requests for the same page
+    share one fetch, cached for READ_CACHE_TTL_SECONDS; a client that wrote
+    recently reads the page from the primary instead.
+    """
     try:
-        comments = db.query(Comment)\
-            .join(User)\
-            .filter(Comment.blog_id == blog_id)\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-            
-        # Add user_name to each comment
-        for comment in comments:
-            setattr(comment, 'user_name', comment.user.username)
-            
-        return comments
+        payload = await blog_read_cache.get(
+            str(blog_id), ("comments", skip, limit),
+            lambda engine: fetch_comments_payload(engine, blog_id, skip, limit),
+            primary=has_recent_write(request)
+        )
+        return Response(content=payload, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -92,12 +110,12 @@ async def update_comment(
     comment_id: UUID,
     comment_data: CommentUpdate,
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Update a comment (only owner can update)"""
     try:
         comment = db.query(Comment)\
-            .filter(Comment.id == comment_id, Comment.blog_id == blog_id)\
+            .filter(Comment.id == comment_id, Comment.blog_id == blog_id, Comment.deleted_at.is_(None))\
             .first()
             
         if not comment:
@@ -107,7 +125,7 @@ async def update_comment(
             )
             
         # Check if user is comment owner
-        if str(comment.user_id) != token_data["sub"]:
+        if str(comment.user_id) != current_user.sub:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to update this comment"
@@ -115,12 +133,13 @@ async def update_comment(
             
         comment.comment = comment_data.comment
         db.commit()
+        blog_read_cache.invalidate(str(blog_id))
         db.refresh(comment)
         
         # Add user_name to response
-        setattr(comment, 'user_name', token_data["username"])
+        setattr(comment, 'user_name', current_user.username)
         
-        return comment
+        return comment_serializer.response(comment)
         
     except HTTPException:
         raise
@@ -136,12 +155,12 @@ async def delete_comment(
     blog_id: UUID,
     comment_id: UUID,
     db: Session = Depends(get_db),
-    token_data: dict = Depends(verify_token)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Delete a comment (only owner or admin can delete)"""
     try:
         comment = db.query(Comment)\
-            .filter(Comment.id == comment_id, Comment.blog_id == blog_id)\
+            .filter(Comment.id == comment_id, Comment.blog_id == blog_id, Comment.deleted_at.is_(None))\
             .first()
             
         if not comment:
@@ -151,8 +170,8 @@ async def delete_comment(
             )
             
         # Check if user is comment owner or admin
-        is_admin = token_data.get("role") == "admin"
-        is_owner = str(comment.user_id) == token_data["sub"]
+        is_admin = current_user.is_admin
+        is_owner = str(comment.user_id) == current_user.sub
         
         if not (is_admin or is_owner):
             raise HTTPException(
@@ -160,13 +179,12 @@ async def delete_comment(
                 detail="Not authorized to delete this comment"
             )
             
-        # Update blog's comment count
-        blog = db.query(Blog).filter(Blog.id == blog_id).first()
-        if blog:
-            blog.comment_count = max(0, blog.comment_count - 1)
-            
         db.delete(comment)
+        # The blog's comment count is recomputed in the background
+        enqueue(db, "reconcile_blog_counters", blog_id=str(blog_id))
         db.commit()
+        job_worker.notify()
+        blog_read_cache.invalidate(str(blog_id))
         
         return {"message": "Comment deleted successfully"}
         
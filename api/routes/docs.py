@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Request, Response
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from api.helper.openapi import etag_matches, openapi_document
+from config import get_settings
+
+settings = get_settings()
+
+router = APIRouter(include_in_schema=False)
+
+SWAGGER_UI_PARAMETERS = {
+    "persistAuthorization": True,
+    "defaultModelsExpandDepth": -1,
+    "filter": True,
+    "operationsSorter": "method"
+}
+
+@router.get("/openapi.json")
+async def get_openapi_schema(request: Request):
+    """Static OpenAPI schema; clients revalidate with If-None-Match and get 304s"""
+    body, etag = openapi_document(request.app)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/docs")
+async def get_swagger_ui():
+    return get_swagger_ui_html(
+        openapi_url="/openapi.json",
+        title=f"{settings.APP_NAME} - Swagger UI",
+        swagger_ui_parameters=SWAGGER_UI_PARAMETERS
+    )
+
+@router.get("/redoc")
+async def get_redoc():
+    return get_redoc_html(
+        openapi_url="/openapi.json",
+        title=f"{settings.APP_NAME} - ReDoc"
+    )
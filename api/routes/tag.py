@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from api import queries
+from api.db import get_read_db
+from api.schemas.tag import TagResponse
+from api.helper.auth_bearer import verify_token
+from api.helper.serializers import tag_serializer
+from config import get_settings
+from typing import List
+
+settings = get_settings()
+
+router = APIRouter(
+    prefix="/tags",
+    tags=["tags"]
+)
+
+@router.get("/", response_model=List[TagResponse])
+async def get_tag_cloud(
+    limit: int = Query(settings.TAG_CLOUD_SIZE, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Most used tags with their number of live blogs, for a tag cloud. Counts
+    are maintained as blogs are tagged and deleted, so this reads the top of
+    one index instead of counting blog_tags.
+    """
+    try:
+        tags = db.execute(queries.tag_cloud(limit)).all()
+        return tag_serializer.response(tags, many=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching tags: {str(e)}"
+        )
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session, joinedload
-from api.db import get_db
-from api.models import User, Blog
-from api.schemas.user import UserProfileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, load_only
+from api import queries
+from api.db import get_db, get_read_db
+from api.models import User, Blog, Follow
+from api.schemas.blog import BlogResponse
+from api.schemas.user import UserProfileResponse, UserProfileUpdate
 from api.helper.auth_bearer import verify_token
+from api.helper.cloudinary_helper import upload_image, delete_image
+from api.helper.current_user import CurrentUser, get_current_user
+from api.helper.export import EXPORT_FORMATS, stream_export
+from api.helper.jobs import enqueue, job_worker
+from api.helper.serializers import ModelSerializer, blog_serializer, blog_summary_serializer, profile_serializer, profile_summary_serializer
+from api.helper.tags import decode_cursor, encode_cursor
+from api.helper.timeline import backfill_timeline, is_fanout_author, read_timeline, remove_author_from_timeline
 from typing import Optional, List
 from uuid import UUID
 
@@ -12,19 +24,42 @@ router = APIRouter(
     tags=["users"]
 )
 
+def load_profile(db: Session, user_id, serializer: ModelSerializer, active_only: bool = False) -> Optional[User]:
+    """User with the live blogs the profile serializer needs, limited to the columns the response uses"""
+    blog_fields = serializer.nested["blogs"].field_names
+    columns = [getattr(Blog, name) for name in blog_fields if name in Blog.__table__.c]
+    statement = queries.profile(user_id, columns, active_only).execution_options(populate_existing=True)
+    return db.execute(statement).unique().scalars().first()
+
+def profile_data(user: User) -> dict:
+    """Profile response fields of a user loaded with load_profile()"""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "bio": user.bio,
+        "title": user.title,
+        "twitter_url": user.twitter_url,
+        "instagram_url": user.instagram_url,
+        "linkedin_url": user.linkedin_url,
+        "profile_image": user.profile_image,
+        "follower_count": user.follower_count,
+        "following_count": user.following_count,
+        "created_at": user.created_at,
+        "blogs": user.blogs
+    }
+
 @router.get("/profile", response_model=UserProfileResponse)
 async def get_own_profile(
-    db: Session = Depends(get_db),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns blog excerpts instead of full descriptions"),
+    db: Session = Depends(get_read_db),
     token_data: dict = Depends(verify_token)
 ):
     """Get current user's profile with their blogs"""
+    serializer = profile_summary_serializer if view == "summary" else profile_serializer
     try:
         # Get user with blogs
-        user = db.query(User).options(
-            joinedload(User.blogs)
-        ).filter(
-            User.id == token_data["sub"]
-        ).first()
+        user = load_profile(db, token_data["sub"], serializer)
         
         if not user:
             raise HTTPException(
@@ -32,19 +67,7 @@ async def get_own_profile(
                 detail="User not found"
             )
         
-        return {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "bio": user.bio,
-            "title": user.title,
-            "twitter_url": user.twitter_url,
-            "instagram_url": user.instagram_url,
-            "linkedin_url": user.linkedin_url,
-            "profile_image": user.profile_image,
-            "created_at": user.created_at,
-            "blogs": user.blogs
-        }
+        return serializer.response(profile_data(user))
         
     except Exception as e:
         raise HTTPException(
@@ -52,21 +75,132 @@ async def get_own_profile(
             detail=f"Error fetching profile: {str(e)}"
         )
 
+@router.put("/profile", response_model=UserProfileResponse)
+async def update_profile(
+    profile_update: UserProfileUpdate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Update the current user's bio, title and social links; omitted fields are left unchanged"""
+    try:
+        user = load_profile(db, current_user.sub, profile_serializer)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        for field, value in profile_update.model_dump(exclude_unset=True).items():
+            setattr(user, field, value)
+        db.commit()
+        # Reload so the blogs keep the live-only filter and column selection
+        return profile_serializer.response(profile_data(load_profile(db, current_user.sub, profile_serializer)))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating profile: {str(e)}"
+        )
+
+@router.patch("/profile/image", response_model=UserProfileResponse)
+async def update_profile_image(
+    image: UploadFile = File(..., description="New profile image"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Replace the current user's profile image. The new image is copied to the
+    author_avatar_url of their blogs in the background.
+    """
+    if not image.content_type or not image.content_type.startswith('image/'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be an image"
+        )
+    image_url = None
+    try:
+        user = load_profile(db, current_user.sub, profile_serializer)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        image_url = await upload_image(image, folder="profiles")
+        # The old image is deleted once the change is committed; committing
+        # the change also queues the propagation job (see author_summary)
+        if user.profile_image:
+            enqueue(db, "delete_image", image_url=user.profile_image)
+        user.profile_image = image_url
+        db.commit()
+        job_worker.notify()
+        # Reload so the blogs keep the live-only filter and column selection
+        return profile_serializer.response(profile_data(load_profile(db, current_user.sub, profile_serializer)))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        if image_url:
+            await delete_image(image_url)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating profile image: {str(e)}"
+        )
+
+@router.get("/me/timeline", response_model=List[BlogResponse])
+async def get_timeline(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns the excerpt instead of the full description"),
+    db: Session = Depends(get_read_db),
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Newest blogs from the authors the current user follows. The next page is
+    fetched by passing the X-Next-Cursor header as cursor; the header is only
+    set when more blogs may follow.
+    """
+    serializer = blog_summary_serializer if view == "summary" else blog_serializer
+    after = decode_cursor(cursor) if cursor else None
+    try:
+        rows = read_timeline(db, token_data["sub"], after, limit)
+        if not rows:
+            return serializer.response([], many=True)
+        blog_ids = [blog_id for _, blog_id in rows]
+
+        columns = [getattr(Blog, name) for name in serializer.field_names if name in Blog.__table__.c]
+        blogs = {
+            blog.id: blog
+            for blog in db.query(Blog).options(load_only(*columns)).filter(Blog.id.in_(blog_ids), queries.live_blogs()).all()
+        }
+        response = serializer.response([blogs[blog_id] for blog_id in blog_ids if blog_id in blogs], many=True)
+        # The cursor follows the timeline, not the blogs left after filtering
+        if len(rows) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(*rows[-1])
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching timeline: {str(e)}"
+        )
+
 @router.get("/{user_id}", response_model=UserProfileResponse)
 async def get_user_profile(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns blog excerpts instead of full descriptions"),
+    db: Session = Depends(get_read_db),
     token_data: dict = Depends(verify_token)
 ):
     """Get a specific user's profile with their blogs"""
+    serializer = profile_summary_serializer if view == "summary" else profile_serializer
     try:
         # Get user with blogs
-        user = db.query(User).options(
-            joinedload(User.blogs)
-        ).filter(
-            User.id == user_id,
-            User.is_active == True
-        ).first()
+        user = load_profile(db, user_id, serializer, active_only=True)
         
         if not user:
             raise HTTPException(
@@ -74,22 +208,103 @@ async def get_user_profile(
                 detail="User not found"
             )
         
-        return {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "bio": user.bio,
-            "title": user.title,
-            "twitter_url": user.twitter_url,
-            "instagram_url": user.instagram_url,
-            "linkedin_url": user.linkedin_url,
-            "profile_image": user.profile_image,
-            "created_at": user.created_at,
-            "blogs": user.blogs
-        }
+        return serializer.response(profile_data(user))
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching user profile: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/{user_id}/follow")
+async def follow_user(
+    user_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Follow a user; their new blogs appear in the current user's timeline"""
+    if str(user_id) == current_user.sub:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot follow yourself"
+        )
+    try:
+        author = db.query(User.id, User.follower_count)\
+            .filter(User.id == user_id, User.is_active == True)\
+            .first()
+        if not author:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        result = db.execute(
+            insert(Follow)
+            .values(follower_id=current_user.sub, followee_id=user_id)
+            .on_conflict_do_nothing()
+        )
+        if result.rowcount:
+            db.execute(update(User).where(User.id == user_id).values(follower_count=User.follower_count + 1))
+            db.execute(update(User).where(User.id == current_user.sub).values(following_count=User.following_count + 1))
+            if is_fanout_author(author.follower_count + 1):
+                backfill_timeline(db, current_user.sub, user_id)
+        db.commit()
+
+        return {"message": "User followed successfully"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error following user: {str(e)}"
+        )
+
+@router.delete("/{user_id}/follow")
+async def unfollow_user(
+    user_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stop following a user and drop their blogs from the timeline"""
+    try:
+        deleted = db.query(Follow)\
+            .filter(Follow.follower_id == current_user.sub, Follow.followee_id == user_id)\
+            .delete(synchronize_session=False)
+        if deleted:
+            db.execute(update(User).where(User.id == user_id).values(follower_count=User.follower_count - 1))
+            db.execute(update(User).where(User.id == current_user.sub).values(following_count=User.following_count - 1))
+            remove_author_from_timeline(db, current_user.sub, user_id)
+        db.commit()
+
+        return {"message": "User unfollowed successfully"}
+
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error unfollowing user: {str(e)}"
+        )
+
+@router.get("/{user_id}/export")
+async def export_user_data(
+    user_id: UUID,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Stream a user's account, blogs, comments and likes as NDJSON or CSV.
+    Only the user themselves or an admin can export.
+    """
+    if str(user_id) != current_user.sub and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to export this user's data"
+        )
+
+    return StreamingResponse(
+        stream_export(user_id, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="echoblog-{user_id}.{format}"'}
+    )
@@ -16,13 +16,22 @@ class BlogResponse(BaseModel):
     id: UUID4
     title: str
     description: str
+    excerpt: Optional[str] = None
     image_url: Optional[str]
     like_count: int = 0
     comment_count: int = 0
+    view_count: int = 0
+    unique_view_count: int = 0
+    tags: List[str] = []
+    status: str = "published"
+    publish_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     user_id: UUID4
+    author_username: Optional[str] = None
+    author_avatar_url: Optional[str] = None
     is_active: bool = True
+    liked_by_me: Optional[bool] = None
     
     class Config:
         from_attributes = True
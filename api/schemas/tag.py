@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+class TagResponse(BaseModel):
+    name: str
+    post_count: int
+
+    class Config:
+        from_attributes = True
@@ -6,6 +6,7 @@ class BlogInProfile(BaseModel):
     id: UUID4
     title: str
     description: str
+    excerpt: Optional[str] = None
     image_url: Optional[str]
     like_count: int
     comment_count: int
@@ -24,6 +25,8 @@ class UserProfileResponse(BaseModel):
     instagram_url: Optional[str]
     linkedin_url: Optional[str]
     profile_image: Optional[str]
+    follower_count: int = 0
+    following_count: int = 0
     created_at: datetime
     blogs: List[BlogInProfile] = []
     
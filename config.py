@@ -1,7 +1,7 @@
 import os
 from functools import lru_cache
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List
 
 load_dotenv()
 
@@ -12,8 +12,34 @@ class Settings:
     SERVER_HOST: str = os.getenv('SERVER_HOST', '0.0.0.0')
     SERVER_PORT: int = int(os.getenv('SERVER_PORT', '8000'))
     SERVER_WORKERS: int = int(os.getenv("WORKERS", "1"))
+    SERVER_RELOAD: bool = os.getenv("RELOAD", "false").lower() in ("1", "true", "yes")
+    # "auto" picks uvloop / httptools when they are installed
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")
+    SERVER_KEEPALIVE_SECONDS: int = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+    # Swagger UI, ReDoc and /openapi.json; disable in production. The schema is
+    # served from OPENAPI_SCHEMA_PATH (written by `python -m api.cli.openapi`)
+    DOCS_ENABLED: bool = os.getenv("DOCS_ENABLED", "true").lower() in ("1", "true", "yes")
+    OPENAPI_SCHEMA_PATH: str = os.getenv("OPENAPI_SCHEMA_PATH", "openapi.json")
     
     DATABASE_URL:str = os.getenv("DATABASE_URL","")
+    # Per worker process: total connections = WORKERS * (pool size + overflow)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Log every SQL statement (through the sqlalchemy.engine logger)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+    # Read replicas for GET handlers (comma-separated URLs, empty = primary only)
+    DATABASE_REPLICA_URLS: List[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_HEALTH_CHECK_SECONDS: float = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+    REPLICA_CONNECT_TIMEOUT_SECONDS: int = int(os.getenv("REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+    READ_YOUR_WRITES_MAX_CLIENTS: int = int(os.getenv("READ_YOUR_WRITES_MAX_CLIENTS", "100000"))
     
     ALLOWED_ORIGINS: List[str] = [
         origin.strip() for origin in 
@@ -27,6 +53,106 @@ class Settings:
     CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY", "")
     CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET", "")
 
+    # Background jobs (per worker process; 0 disables the job worker)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "5"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    JOB_BACKOFF_SECONDS: float = float(os.getenv("JOB_BACKOFF_SECONDS", "2"))
+    JOB_MAX_BACKOFF_SECONDS: float = float(os.getenv("JOB_MAX_BACKOFF_SECONDS", "300"))
+    JOB_TIMEOUT_SECONDS: int = int(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
+
+    # Personal timelines: authors with at least TIMELINE_FANOUT_MAX_FOLLOWERS
+    # followers are merged in at read time instead of fanned out on write
+    TIMELINE_MAX_ENTRIES: int = int(os.getenv("TIMELINE_MAX_ENTRIES", "800"))
+    TIMELINE_FANOUT_MAX_FOLLOWERS: int = int(os.getenv("TIMELINE_FANOUT_MAX_FOLLOWERS", "10000"))
+    TIMELINE_BACKFILL_POSTS: int = int(os.getenv("TIMELINE_BACKFILL_POSTS", "20"))
+    # Followers' timelines are cut back to TIMELINE_MAX_ENTRIES by one job per
+    # author at most this long after a fan-out, not on every post
+    TIMELINE_TRIM_DELAY_SECONDS: float = float(os.getenv("TIMELINE_TRIM_DELAY_SECONDS", "300"))
+
+    # Blogs updated per transaction when copying a changed username/avatar to an author's blogs
+    AUTHOR_SYNC_CHUNK_SIZE: int = int(os.getenv("AUTHOR_SYNC_CHUNK_SIZE", "500"))
+
+    # Blog views are buffered per worker and flushed every VIEW_FLUSH_SECONDS
+    VIEW_FLUSH_SECONDS: float = float(os.getenv("VIEW_FLUSH_SECONDS", "10"))
+    VIEW_SKETCH_PRECISION: int = int(os.getenv("VIEW_SKETCH_PRECISION", "10"))
+    # Trending score = (unique views + TRENDING_VIEW_WEIGHT * views + 3 * likes + 5 * comments)
+    #                  / (age in hours + 2) ** gravity
+    TRENDING_GRAVITY: float = float(os.getenv("TRENDING_GRAVITY", "1.5"))
+    TRENDING_VIEW_WEIGHT: float = float(os.getenv("TRENDING_VIEW_WEIGHT", "0.1"))
+    TRENDING_WINDOW_DAYS: int = int(os.getenv("TRENDING_WINDOW_DAYS", "7"))
+
+    # Rows per server-side cursor batch and per streamed chunk in exports
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Rows per UPDATE/DELETE statement in admin bulk moderation
+    MODERATION_CHUNK_SIZE: int = int(os.getenv("MODERATION_CHUNK_SIZE", "1000"))
+
+    # Fraction of requests profiled per route (db, serialization, jwt, bcrypt time);
+    # on-demand CPU captures are written to PROFILE_OUTPUT_DIR
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_OUTPUT_DIR: str = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+    PROFILE_MAX_CAPTURE_SECONDS: int = int(os.getenv("PROFILE_MAX_CAPTURE_SECONDS", "60"))
+
+    # Logs are written by a background thread; "json" emits one object per line
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    # Fraction of DEBUG/INFO records kept per logger, e.g. "sqlalchemy.engine=0.01,api.helper.jobs=0.1";
+    # warnings and errors are always kept
+    LOG_SAMPLE_RATES: Dict[str, float] = {
+        name.strip(): float(rate)
+        for name, _, rate in (
+            part.partition("=") for part in os.getenv("LOG_SAMPLE_RATES", "").split(",") if "=" in part
+        )
+    }
+
+    # Response compression (brotli when installed, otherwise gzip)
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "5"))
+    COMPRESSION_CACHE_ENTRIES: int = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "512"))
+    COMPRESSION_CACHE_TTL_SECONDS: int = int(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "300"))
+    COMPRESSION_CACHE_MAX_BODY: int = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", "262144"))
+
+    # Rate limits as "<requests>/<seconds>" per user (or per IP when anonymous)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    RATE_LIMIT_LOGIN: str = os.getenv("RATE_LIMIT_LOGIN", "10/60")
+    RATE_LIMIT_SIGNUP: str = os.getenv("RATE_LIMIT_SIGNUP", "5/3600")
+    RATE_LIMIT_LIKE: str = os.getenv("RATE_LIMIT_LIKE", "60/60")
+    RATE_LIMIT_COMMENT: str = os.getenv("RATE_LIMIT_COMMENT", "20/60")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+    # Idempotency-Key support for POST /blogs/ and POST /blogs/{id}/comments/
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    IDEMPOTENCY_SWEEP_SECONDS: int = int(os.getenv("IDEMPOTENCY_SWEEP_SECONDS", "60"))
+
+    # Cached users rows behind the request identity (role, active status)
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_USERS: int = int(os.getenv("USER_CACHE_MAX_USERS", "10000"))
+
+    LIKE_CACHE_TTL_SECONDS: int = int(os.getenv("LIKE_CACHE_TTL_SECONDS", "60"))
+    LIKE_CACHE_MAX_USERS: int = int(os.getenv("LIKE_CACHE_MAX_USERS", "10000"))
+    LIKE_CACHE_MAX_BLOGS_PER_USER: int = int(os.getenv("LIKE_CACHE_MAX_BLOGS_PER_USER", "500"))
+    LIKE_STATUS_MAX_IDS: int = int(os.getenv("LIKE_STATUS_MAX_IDS", "100"))
+
+    # Serialized blog and comment reads shared by concurrent requests in a worker
+    READ_CACHE_TTL_SECONDS: float = float(os.getenv("READ_CACHE_TTL_SECONDS", "5"))
+    READ_CACHE_MAX_ENTRIES: int = int(os.getenv("READ_CACHE_MAX_ENTRIES", "10000"))
+
+    # Blog excerpts are stored in blogs.excerpt (String(300))
+    EXCERPT_LENGTH: int = min(int(os.getenv("EXCERPT_LENGTH", "280")), 299)
+
+    # Tags per blog and per feed filter; names are lowercased, at most 50 characters
+    MAX_TAGS_PER_BLOG: int = int(os.getenv("MAX_TAGS_PER_BLOG", "5"))
+    TAG_CLOUD_SIZE: int = int(os.getenv("TAG_CLOUD_SIZE", "50"))
+
+    # Scheduled blogs published per transaction; each worker also reloads the
+    # next PUBLISH_LOOKAHEAD due times every PUBLISH_RELOAD_SECONDS
+    PUBLISH_BATCH_SIZE: int = int(os.getenv("PUBLISH_BATCH_SIZE", "500"))
+    PUBLISH_LOOKAHEAD: int = int(os.getenv("PUBLISH_LOOKAHEAD", "1000"))
+    PUBLISH_RELOAD_SECONDS: float = float(os.getenv("PUBLISH_RELOAD_SECONDS", "60"))
+
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
\ No newline at end of file
@@ -1,27 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from api.db import Base, engine
+from api.db import dispose_engine
+from api.helper.compression import CompressionMiddleware
+from api.helper.idempotency import IdempotencyMiddleware
+from api.helper.jobs import job_worker
+from api.helper.openapi import build_openapi_schema
+from api.helper.logging_setup import RequestIdMiddleware, setup_logging
+from api.helper.profiling import ProfilingMiddleware
+from api.helper.publishing import publish_scheduler
+from api.helper.rate_limit import RateLimitMiddleware
+from api.helper.view_counter import view_counter
+import api.helper.job_handlers  # noqa: F401 - registers the job handlers
 from api.routes.auth import router as auth_router
 from api.routes.blog import router as blog_router
 from api.routes.comment import router as comment_router
 from api.routes.user import router as user_router
+from api.routes.admin import router as admin_router
+from api.routes.tag import router as tag_router
+from api.routes.docs import router as docs_router
 from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, ORJSONResponse
 from config import get_settings
 from fastapi.security import OAuth2PasswordBearer
 
 # Load settings
 settings = get_settings()
 
+PUBLIC_PATHS = {"/", "/auth/login", "/auth/signup"}
+if settings.DOCS_ENABLED:
+    PUBLIC_PATHS |= {"/docs", "/openapi.json", "/redoc"}
+
 # Custom authentication middleware
 class AuthMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        public_paths = [
-            "/", "/docs", "/openapi.json", "/redoc",
-            "/auth/login", "/auth/signup"
-        ]
-        if request.url.path in public_paths:
+        if request.url.path in PUBLIC_PATHS:
             return await call_next(request)
 
         if not request.headers.get("Authorization"):
@@ -32,20 +45,44 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
         return await call_next(request)
 
-# Initialize the app
+# Application lifespan. The engine, the Cloudinary client and the in-process
+# caches are all created on first use; the schema is managed by Alembic
+# (`alembic upgrade head`), so starting a worker does no database round trips
+# before it can serve. The background job worker polls in its own tasks, and
+# the publish scheduler loads the due times of scheduled blogs in its own.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener = setup_logging()
+    if settings.JOB_WORKERS > 0:
+        job_worker.start()
+    view_counter.start()
+    publish_scheduler.start()
+    yield
+    await publish_scheduler.stop()
+    await view_counter.stop()
+    await job_worker.stop()
+    dispose_engine()
+    log_listener.stop()
+
+# Initialize the app. The docs routes are served by api/routes/docs.py (when
+# DOCS_ENABLED) from the schema generated at build time, so FastAPI's own are off
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
-    swagger_ui_parameters={
-        "persistAuthorization": True,
-        "defaultModelsExpandDepth": -1,
-        "displayRequestDuration": True,
-        "filter": True,
-        "operationsSorter": "method"
-    }
+    default_response_class=ORJSONResponse,
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None
 )
 
+# Replay responses of retried POSTs carrying an Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
+
+# Throttle login, signup, likes and comments (inside CORS so 429s keep CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -59,56 +96,34 @@ app.add_middleware(
 # OAuth2 Bearer Token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-# Custom OpenAPI schema
+# Custom OpenAPI schema, built on demand: by `python -m api.cli.openapi` at
+# build time, or on the first /openapi.json request when no file was built
 def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
-
-    openapi_schema = get_openapi(
-        title=f"{settings.APP_NAME} API",
-        version=settings.APP_VERSION,
-        description="EchoBlog API documentation",
-        routes=app.routes,
-    )
-
-    openapi_schema["components"] = {
-        "securitySchemes": {
-            "bearerAuth": {
-                "type": "http",
-                "scheme": "bearer",
-                "bearerFormat": "JWT",
-                "description": "Enter your JWT token"
-            }
-        }
-    }
-
-    # Add global security for all routes except auth
-    api_routes = [route for route in app.routes if getattr(route, "tags", None)]
-    for route in api_routes:
-        path = openapi_schema["paths"][route.path]
-        operations = [op for op in path if op in ["get", "post", "put", "delete", "patch"]]
-        
-        for op in operations:
-            if "authentication" not in route.tags:
-                path[op]["security"] = [{"bearerAuth": []}]
-
-    app.openapi_schema = openapi_schema
+    if not app.openapi_schema:
+        app.openapi_schema = build_openapi_schema(app)
     return app.openapi_schema
 
 app.openapi = custom_openapi
 app.add_middleware(AuthMiddleware)
 
-# Database setup
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    raise RuntimeError(f"Database initialization failed: {e}")
+# Around everything but the profiler, so every response (including errors from the middleware above) can be compressed
+app.add_middleware(CompressionMiddleware)
+
+# Times a sample of requests end to end (see /admin/profile)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so everything logged while handling a request carries its id
+app.add_middleware(RequestIdMiddleware)
 
 # Include routers
 app.include_router(auth_router)
 app.include_router(blog_router)
 app.include_router(comment_router)
 app.include_router(user_router)
+app.include_router(admin_router)
+app.include_router(tag_router)
+if settings.DOCS_ENABLED:
+    app.include_router(docs_router)
 
 # Root route
 @app.get("/")
@@ -123,9 +138,20 @@ def read_root():
 # Main entry point
 if __name__ == '__main__':
     import uvicorn
+
+    # With WORKERS > 1 uvicorn supervises that many processes. On SIGTERM
+    # each worker stops accepting connections, lets in-flight requests finish
+    # (up to SERVER_GRACEFUL_TIMEOUT_SECONDS) and then runs the lifespan
+    # shutdown, which disposes the database pool.
     uvicorn.run(
         "main:app",
         host=settings.SERVER_HOST,
         port=settings.SERVER_PORT,
-        reload=settings.SERVER_WORKERS
+        reload=settings.SERVER_RELOAD,
+        workers=1 if settings.SERVER_RELOAD else settings.SERVER_WORKERS,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
     )
@@ -0,0 +1,72 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases created by the old ``Base.metadata.create_all`` call already have
+these tables: mark them with ``alembic stamp 0001`` before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _base_columns():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("info", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("username", sa.String(30), nullable=False, unique=True),
+        sa.Column("email", sa.String(50), nullable=False, unique=True),
+        sa.Column("password", sa.String(255), nullable=False),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("title", sa.String(30), nullable=True),
+        sa.Column("twitter_url", sa.String(200), nullable=True),
+        sa.Column("instagram_url", sa.String(200), nullable=True),
+        sa.Column("linkedin_url", sa.String(200), nullable=True),
+        sa.Column("role", sa.Enum("USER", "ADMIN", name="userrole"), nullable=False),
+        *_base_columns(),
+    )
+    op.create_table(
+        "blogs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("title", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("image_url", sa.String(500), nullable=True),
+        sa.Column("like_count", sa.Integer(), nullable=True),
+        sa.Column("like_user", postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column("comment_count", sa.Integer(), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        *_base_columns(),
+    )
+    op.create_table(
+        "comments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("blog_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("blogs.id"), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        *_base_columns(),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("comments")
+    op.drop_table("blogs")
+    op.drop_table("users")
+    sa.Enum(name="userrole").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,42 @@
+"""blogs.excerpt
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from api.helper.text_helper import make_excerpt
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column("blogs", sa.Column("excerpt", sa.String(300), nullable=True))
+
+    # Backfill with the same function the routes use, in keyset batches
+    conn = op.get_bind()
+    blogs = sa.table("blogs", sa.column("id"), sa.column("description"), sa.column("excerpt"))
+    last_id = None
+    while True:
+        query = sa.select(blogs.c.id, blogs.c.description).order_by(blogs.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(blogs.c.id > last_id)
+        rows = conn.execute(query).all()
+        if not rows:
+            break
+        conn.execute(
+            blogs.update().where(blogs.c.id == sa.bindparam("blog_id")).values(excerpt=sa.bindparam("value")),
+            [{"blog_id": row.id, "value": make_excerpt(row.description)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column("blogs", "excerpt")
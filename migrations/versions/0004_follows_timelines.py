@@ -0,0 +1,48 @@
+"""follows and timelines
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("follower_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("users", sa.Column("following_count", sa.Integer(), server_default="0", nullable=False))
+
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("followee_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_follows_followee_id", "follows", ["followee_id", "follower_id"])
+
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("blog_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_timeline_entries_user_created", "timeline_entries",
+        ["user_id", sa.text("created_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_timeline_entries_user_created", table_name="timeline_entries")
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_follows_followee_id", table_name="follows")
+    op.drop_table("follows")
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "follower_count")
@@ -0,0 +1,26 @@
+"""blog view counters
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("blogs", sa.Column("view_count", sa.BigInteger(), server_default="0", nullable=False))
+    op.add_column("blogs", sa.Column("unique_view_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("blogs", sa.Column("unique_viewers_sketch", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("blogs", "unique_viewers_sketch")
+    op.drop_column("blogs", "unique_view_count")
+    op.drop_column("blogs", "view_count")
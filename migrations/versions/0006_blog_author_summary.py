@@ -0,0 +1,32 @@
+"""denormalized author summary on blogs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("profile_image", sa.String(length=500), nullable=True))
+    op.add_column("blogs", sa.Column("author_username", sa.String(length=30), nullable=True))
+    op.add_column("blogs", sa.Column("author_avatar_url", sa.String(length=500), nullable=True))
+    op.execute("""
+        UPDATE blogs
+        SET author_username = users.username, author_avatar_url = users.profile_image
+        FROM users
+        WHERE users.id = blogs.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("blogs", "author_avatar_url")
+    op.drop_column("blogs", "author_username")
+    op.drop_column("users", "profile_image")
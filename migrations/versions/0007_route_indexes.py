@@ -0,0 +1,43 @@
+"""indexes for route queries
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Built CONCURRENTLY so existing tables stay writable; that cannot run inside
+# the migration transaction, hence the autocommit blocks
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blogs_live_created", "blogs", ["created_at", "id"],
+            postgresql_where=sa.text("deleted_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+        op.create_index("ix_blogs_user_created", "blogs", ["user_id", "created_at"], postgresql_concurrently=True)
+        op.create_index(
+            "ix_comments_blog_created", "comments", ["blog_id", "created_at", "id"],
+            postgresql_include=["deleted_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index("ix_comments_user_id", "comments", ["user_id"], postgresql_concurrently=True)
+        op.create_index("ix_timeline_entries_blog_id", "timeline_entries", ["blog_id"], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_timeline_entries_blog_id", table_name="timeline_entries", postgresql_concurrently=True)
+        op.drop_index("ix_comments_user_id", table_name="comments", postgresql_concurrently=True)
+        op.drop_index("ix_comments_blog_created", table_name="comments", postgresql_concurrently=True)
+        op.drop_index("ix_blogs_user_created", table_name="blogs", postgresql_concurrently=True)
+        op.drop_index("ix_blogs_live_created", table_name="blogs", postgresql_concurrently=True)
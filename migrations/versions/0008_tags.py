@@ -0,0 +1,44 @@
+"""blog tags
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tags",
+        sa.Column("name", sa.String(length=50), primary_key=True),
+        sa.Column("post_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_tags_post_count", "tags", [sa.text("post_count DESC"), "name"])
+
+    op.create_table(
+        "blog_tags",
+        sa.Column("blog_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tag", sa.String(length=50), sa.ForeignKey("tags.name", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_index("ix_blog_tags_tag", "blog_tags", ["tag", "blog_id"])
+
+    op.add_column("blogs", sa.Column("tags", postgresql.ARRAY(sa.String(length=50)), server_default="{}", nullable=False))
+    op.create_index("ix_blogs_tags", "blogs", ["tags"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_blogs_tags", table_name="blogs")
+    op.drop_column("blogs", "tags")
+    op.drop_index("ix_blog_tags_tag", table_name="blog_tags")
+    op.drop_table("blog_tags")
+    op.drop_index("ix_tags_post_count", table_name="tags")
+    op.drop_table("tags")
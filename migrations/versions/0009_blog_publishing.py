@@ -0,0 +1,53 @@
+"""draft and scheduled blogs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    blogstatus = sa.Enum("DRAFT", "SCHEDULED", "PUBLISHED", name="blogstatus")
+    blogstatus.create(op.get_bind(), checkfirst=True)
+    # Existing blogs were all published on creation
+    op.add_column("blogs", sa.Column("status", blogstatus, server_default="PUBLISHED", nullable=False))
+    op.add_column("blogs", sa.Column("publish_at", sa.DateTime(timezone=True), nullable=True))
+
+    # The feed index is rebuilt with the status in its predicate; the new one
+    # is built under a temporary name first so feeds are never without one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blogs_live_created_new", "blogs", ["created_at", "id"],
+            postgresql_where=sa.text("deleted_at IS NULL AND status = 'PUBLISHED'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_blogs_live_created", table_name="blogs", postgresql_concurrently=True)
+        op.execute("ALTER INDEX ix_blogs_live_created_new RENAME TO ix_blogs_live_created")
+        op.create_index(
+            "ix_blogs_scheduled_publish_at", "blogs", ["publish_at"],
+            postgresql_where=sa.text("status = 'SCHEDULED' AND deleted_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_blogs_scheduled_publish_at", table_name="blogs", postgresql_concurrently=True)
+        op.create_index(
+            "ix_blogs_live_created_old", "blogs", ["created_at", "id"],
+            postgresql_where=sa.text("deleted_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_blogs_live_created", table_name="blogs", postgresql_concurrently=True)
+        op.execute("ALTER INDEX ix_blogs_live_created_old RENAME TO ix_blogs_live_created")
+    op.drop_column("blogs", "publish_at")
+    op.drop_column("blogs", "status")
+    sa.Enum(name="blogstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,37 @@
+"""keyset order for timelines
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def _replace_index(name: str, table: str, columns) -> None:
+    # Built under a temporary name first so reads are never without one
+    op.create_index(f"{name}_new", table, columns, postgresql_concurrently=True)
+    op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def upgrade() -> None:
+    # Timelines page by (created_at, blog id), so the id joins both indexes
+    with op.get_context().autocommit_block():
+        _replace_index(
+            "ix_timeline_entries_user_created", "timeline_entries",
+            ["user_id", sa.text("created_at DESC"), sa.text("blog_id DESC")],
+        )
+        _replace_index("ix_blogs_user_created", "blogs", ["user_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _replace_index("ix_timeline_entries_user_created", "timeline_entries", ["user_id", sa.text("created_at DESC")])
+        _replace_index("ix_blogs_user_created", "blogs", ["user_id", "created_at"])
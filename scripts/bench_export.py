@@ -0,0 +1,114 @@
+"""
+Throughput and peak memory of the streaming data export.
+
+    python scripts/bench_export.py [--seed 20000] [--all] [--repeat 3]
+
+Runs stream_export for NDJSON and CSV against the database at DATABASE_URL
+and, as a baseline, the same records loaded into a list and encoded in one
+go, the way the export worked before it streamed. ``--seed N`` first creates
+a throwaway user with N blogs and N comments, exports that user and deletes
+it afterwards; ``--all`` exports every user instead. Throughput is the best
+of ``--repeat`` runs; peak memory is measured by tracemalloc in a separate
+run, since tracing slows Python allocations down.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import orjson
+from sqlalchemy import delete, insert
+from api.db import SessionLocal, get_engine
+from api.helper.export import export_records, stream_export
+from api.models import Blog, Comment, User
+
+
+def seed(count: int) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    blog_ids = [uuid.uuid4() for _ in range(count)]
+    with SessionLocal(bind=get_engine()) as db:
+        db.execute(insert(User), [{
+            "id": user_id, "username": f"bench-{user_id.hex[:20]}", "email": f"{user_id.hex[:30]}@bench.local",
+            "password": "-", "bio": "Benchmark user",
+        }])
+        db.execute(insert(Blog), [
+            {"id": blog_id, "user_id": user_id, "title": f"Blog {i}",
+             "description": "Lorem ipsum dolor sit amet. " * 40, "like_user": [str(user_id)], "like_count": 1}
+            for i, blog_id in enumerate(blog_ids)
+        ])
+        db.execute(insert(Comment), [
+            {"id": uuid.uuid4(), "user_id": user_id, "blog_id": blog_id, "comment": "Nice post! " * 5}
+            for blog_id in blog_ids
+        ])
+        db.commit()
+    return user_id
+
+
+def unseed(user_id: uuid.UUID) -> None:
+    with SessionLocal(bind=get_engine()) as db:
+        db.execute(delete(Comment).where(Comment.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+
+
+def streamed(user_id, fmt: str):
+    size = 0
+    for chunk in stream_export(user_id, fmt):
+        size += len(chunk)
+    return size
+
+
+def materialized(user_id):
+    records = list(export_records(user_id))
+    return len(b"\n".join(orjson.dumps(record) for record in records))
+
+
+def measure(export, *args):
+    """(seconds, bytes) of one run"""
+    started = time.perf_counter()
+    size = export(*args)
+    return time.perf_counter() - started, size
+
+
+def peak_memory(export, *args) -> int:
+    tracemalloc.start()
+    try:
+        export(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the streaming data export")
+    parser.add_argument("--seed", type=int, default=20000, help="Blogs and comments to create for a throwaway user")
+    parser.add_argument("--all", action="store_true", help="Export every user instead of seeding one")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is reported")
+    args = parser.parse_args(argv)
+
+    user_id = None if args.all else seed(args.seed)
+    try:
+        records = sum(1 for _ in export_records(user_id))
+        print(f"{records} records exported ({'all users' if args.all else 'seeded user'})")
+        print(f"{'path':<20} {'seconds':>9} {'records/s':>11} {'MB':>8} {'peak MB':>9}")
+        for name, export, export_args in (
+            ("stream ndjson", streamed, (user_id, "ndjson")),
+            ("stream csv", streamed, (user_id, "csv")),
+            ("list + ndjson", materialized, (user_id,)),
+        ):
+            seconds, size = min(measure(export, *export_args) for _ in range(args.repeat))
+            peak = peak_memory(export, *export_args)
+            print(f"{name:<20} {seconds:>9.3f} {records / seconds:>11.0f} "
+                  f"{size / 1e6:>8.1f} {peak / 1e6:>9.1f}")
+    finally:
+        if user_id is not None:
+            unseed(user_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Rows per second of the bulk import against ORM inserts.
+
+    python scripts/bench_import.py [--rows 50000] [--chunk-size 5000] [--workers 4]
+
+Generates ``--rows`` synthetic blogs for a throwaway user, prepares them
+once with the importer's prepare_blogs and loads them into the database at
+DATABASE_URL (PostgreSQL) along each path:
+
+- ORM: ``Blog`` objects added to a session and committed per chunk, the way
+  rows were inserted before the importer existed
+- executemany: one Core ``INSERT`` per chunk
+- COPY: api.cli.import_data.copy_rows per chunk, in this process
+- COPY parallel: the same chunks over ``--workers`` processes, as the importer runs
+
+The loaded rows are deleted after each path and the user at the end.
+"""
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert
+from api.cli.import_data import _init_worker, chunked, copy_rows, prepare_blogs
+from api.db import SessionLocal, get_engine
+from api.models import Blog, User
+
+
+def make_records(user_id: uuid.UUID, count: int):
+    return [
+        {"user_id": str(user_id), "title": f"Blog {i}", "body": "Lorem ipsum dolor sit amet. " * 40,
+         "view_count": i, "created_at": "2024-01-01T00:00:00+00:00"}
+        for i in range(count)
+    ]
+
+
+def orm_insert(chunks, workers):
+    for chunk in chunks:
+        with SessionLocal(bind=get_engine()) as db:
+            db.add_all(Blog(**row) for row in chunk)
+            db.commit()
+
+
+def executemany_insert(chunks, workers):
+    with get_engine().begin() as conn:
+        for chunk in chunks:
+            conn.execute(insert(Blog), chunk)
+
+
+def copy_insert(chunks, workers):
+    for chunk in chunks:
+        copy_rows(Blog.__tablename__, chunk)
+
+
+def parallel_copy_insert(chunks, workers):
+    get_engine().dispose()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for future in [pool.submit(copy_rows, Blog.__tablename__, chunk) for chunk in chunks]:
+            future.result()
+
+
+PATHS = [
+    ("ORM", orm_insert),
+    ("executemany", executemany_insert),
+    ("COPY", copy_insert),
+    ("COPY parallel", parallel_copy_insert),
+]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark COPY imports against ORM inserts")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic blogs to load per path")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per commit or COPY")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the parallel COPY path")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        print(f"Imports need PostgreSQL, DATABASE_URL points to {engine.dialect.name}", file=sys.stderr)
+        return 1
+
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": user_id, "username": f"bench-{user_id.hex[:20]}", "email": f"{user_id.hex[:30]}@bench.local",
+            "password": "-",
+        }])
+    rows = prepare_blogs(make_records(user_id, args.rows))
+    chunks = list(chunked(iter(rows), args.chunk_size))
+
+    print(f"{args.rows} rows in chunks of {args.chunk_size}")
+    print(f"{'path':<15} {'seconds':>9} {'rows/s':>10}")
+    try:
+        for name, load in PATHS:
+            started = time.perf_counter()
+            load(chunks, args.workers)
+            seconds = time.perf_counter() - started
+            print(f"{name:<15} {seconds:>9.2f} {args.rows / seconds:>10.0f}")
+            with engine.begin() as conn:
+                conn.execute(delete(Blog).where(Blog.user_id == user_id))
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(User).where(User.id == user_id))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
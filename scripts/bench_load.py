@@ -0,0 +1,148 @@
+"""
+Throughput and latency of the server per worker count and event loop.
+
+    python scripts/bench_load.py [--workers 1,2,4] [--loops asyncio,uvloop]
+                                 [--path /] [--token <jwt>] [--connections 64] [--seconds 10]
+
+For every combination the script starts `python main.py` with WORKERS and
+SERVER_LOOP set, waits until it answers, keeps ``--connections`` keep-alive
+connections busy for ``--seconds`` and then stops the server with SIGTERM.
+It reports requests per second and latency percentiles. The default path,
+``/``, needs no database; pass a path such as ``/blogs/?limit=20`` and a
+``--token`` to load a route against a seeded database.
+
+The load generator is a plain asyncio HTTP/1.1 client running in this
+process, so on a single machine it can become the bottleneck before the
+server does. For higher ceilings, start the server the same way and point
+wrk or hey at it, e.g. ``hey -z 10s -c 64 http://127.0.0.1:8100/``.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    """Read one response with a Content-Length body; returns its status"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _connection(host: str, port: int, request: bytes, deadline: float,
+                      latencies: List[float], errors: List[int]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, path: str, token: Optional[str], connections: int, seconds: float) -> dict:
+    headers = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}", "Accept-Encoding: identity"]
+    if token:
+        headers.append(f"Authorization: Bearer {token}")
+    request = ("\r\n".join(headers) + "\r\n\r\n").encode()
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _connection(host, port, request, started + seconds, latencies, errors)
+        for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+def start_server(workers: int, loop: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, WORKERS=str(workers), SERVER_LOOP=loop, SERVER_PORT=str(port),
+               SERVER_HOST="127.0.0.1", RELOAD="false", LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"))
+    return subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_until_ready(host: str, port: int, path: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+            await _read_response(reader)
+            writer.close()
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load the server for each worker count and event loop")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--loops", default="asyncio,uvloop", help="Comma-separated SERVER_LOOP values")
+    parser.add_argument("--path", default="/", help="Path to request")
+    parser.add_argument("--token", help="Bearer token for authenticated paths")
+    parser.add_argument("--connections", type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each run")
+    parser.add_argument("--port", type=int, default=8100, help="Port to start the server on")
+    args = parser.parse_args(argv)
+
+    host = "127.0.0.1"
+    print(f"{'workers':>7} {'loop':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'errors':>7}")
+    for loop in args.loops.split(","):
+        for workers in (int(count) for count in args.workers.split(",")):
+            server = start_server(workers, loop, args.port)
+            try:
+                asyncio.run(wait_until_ready(host, args.port, args.path))
+                result = asyncio.run(run_load(host, args.port, args.path, args.token, args.connections, args.seconds))
+            finally:
+                stop_server(server)
+            print(f"{workers:>7} {loop:>8} {result['rps']:>10.0f} {result['p50']:>8.2f} "
+                  f"{result['p99']:>8.2f} {result['mean']:>8.2f} {result['errors']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
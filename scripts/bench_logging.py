@@ -0,0 +1,96 @@
+"""
+Cost of a log call in the request path, queued against synchronous.
+
+    python scripts/bench_logging.py [--records 20000] [--format json|text] [--write-delay-ms 0,0.05]
+
+Compares the handler setup_logging installs (the caller only enqueues the
+record; a listener thread formats and writes it) with a synchronous
+StreamHandler using the same formatter and filters, as logging.basicConfig
+set up before. Both write to a null stream; ``--write-delay-ms`` makes each
+write sleep that long, to stand in for a slow or blocked stdout such as a
+full pipe to a log collector. Reports the time the logging thread spends per
+call and, for the queue, the time until the listener has written everything.
+"""
+import argparse
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.helper.logging_setup import JsonFormatter, RequestIdFilter, SamplingFilter, setup_logging
+from config import get_settings
+
+settings = get_settings()
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+class SlowStream(io.TextIOBase):
+    """A stream that discards what it is given after ``delay`` seconds per write"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+
+def log_records(logger: logging.Logger, count: int) -> float:
+    """Seconds spent in the calling thread logging ``count`` records"""
+    started = time.perf_counter()
+    for i in range(count):
+        logger.info("Blog %s viewed", i, extra={"blog_id": i, "user_id": "bench"})
+    return time.perf_counter() - started
+
+
+def synchronous(stream, count: int):
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+    elapsed = log_records(logging.getLogger("bench"), count)
+    return elapsed, elapsed
+
+
+def queued(stream, count: int):
+    stdout, sys.stdout = sys.stdout, stream
+    try:
+        listener = setup_logging()
+    finally:
+        sys.stdout = stdout
+    logging.getLogger().setLevel(logging.INFO)
+    started = time.perf_counter()
+    elapsed = log_records(logging.getLogger("bench"), count)
+    # stop() waits for the listener to drain the queue
+    listener.stop()
+    return elapsed, time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark queued logging against a synchronous handler")
+    parser.add_argument("--records", type=int, default=20000, help="Records logged per run")
+    parser.add_argument("--format", choices=("json", "text"), default="json", help="LOG_FORMAT to use")
+    parser.add_argument("--write-delay-ms", default="0,0.05", help="Comma-separated delays per write")
+    args = parser.parse_args(argv)
+
+    settings.LOG_FORMAT = args.format
+    print(f"{args.records} records, {args.format} format")
+    print(f"{'handler':<12} {'delay ms':>9} {'caller us/call':>15} {'drained s':>10}")
+    for delay in (float(value) for value in args.write_delay_ms.split(",")):
+        for name, run in (("synchronous", synchronous), ("queue", queued)):
+            caller, drained = run(SlowStream(delay / 1000), args.records)
+            print(f"{name:<12} {delay:>9} {caller / args.records * 1e6:>15.1f} {drained:>10.2f}")
+    logging.getLogger().handlers = []
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
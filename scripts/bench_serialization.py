@@ -0,0 +1,85 @@
+"""
+Serialization cost of a blog list page, per page size.
+
+    python scripts/bench_serialization.py [--sizes 10,50,100,500] [--repeat 5]
+
+Compares the response_model path the routes used before (Pydantic
+validation of the ORM objects, jsonable_encoder and JSONResponse) with
+ModelSerializer on JSONResponse and on ORJSONResponse, the current path.
+Pages are built from in-memory Blog objects, so no database is needed.
+Reports the best time per page of ``--repeat`` runs.
+"""
+import argparse
+import sys
+import timeit
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from api.models import Blog, BlogStatus
+from api.helper.serializers import blog_serializer
+from api.schemas.blog import BlogResponse
+
+blog_list = TypeAdapter(List[BlogResponse])
+
+
+def make_blogs(count: int) -> List[Blog]:
+    now = datetime.now(timezone.utc)
+    return [
+        Blog(
+            id=uuid.uuid4(), title=f"Blog {i}", description="Lorem ipsum dolor sit amet. " * 40,
+            excerpt="Lorem ipsum dolor sit amet.", image_url=None, like_count=i, comment_count=i // 2,
+            view_count=i * 10, unique_view_count=i * 3, tags=["python", "fastapi"], status=BlogStatus.PUBLISHED,
+            publish_at=None, created_at=now, updated_at=now, user_id=uuid.uuid4(),
+            author_username="author", author_avatar_url=None, is_active=True
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_page(blogs) -> bytes:
+    validated = blog_list.validate_python(blogs, from_attributes=True)
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+
+def serializer_json_page(blogs) -> bytes:
+    return JSONResponse(content=jsonable_encoder(blog_serializer.to_list(blogs))).body
+
+
+def serializer_orjson_page(blogs) -> bytes:
+    return ORJSONResponse(content=blog_serializer.to_list(blogs)).body
+
+
+PATHS = [
+    ("pydantic + JSONResponse", pydantic_page),
+    ("ModelSerializer + JSONResponse", serializer_json_page),
+    ("ModelSerializer + ORJSONResponse", serializer_orjson_page),
+]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark blog list serialization per page size")
+    parser.add_argument("--sizes", default="10,50,100,500", help="Comma-separated page sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best is reported")
+    args = parser.parse_args(argv)
+
+    print(f"{'page size':>9}  " + "  ".join(f"{name:>32}" for name, _ in PATHS))
+    for size in (int(size) for size in args.sizes.split(",")):
+        blogs = make_blogs(size)
+        number = max(1, 2000 // size)
+        timings = [
+            min(timeit.repeat(lambda: page(blogs), number=number, repeat=args.repeat)) / number
+            for _, page in PATHS
+        ]
+        print(f"{size:>9}  " + "  ".join(f"{timing * 1000:>29.3f} ms" for timing in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
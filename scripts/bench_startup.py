@@ -0,0 +1,81 @@
+"""
+Worker startup time: importing the app and running its lifespan.
+
+    python scripts/bench_startup.py [--runs 5] [--top 15]
+
+Each run starts a fresh interpreter, so nothing is cached between runs,
+and reports how long `import main` takes, how long the lifespan takes
+until the worker can serve, and how long shutdown takes. Startup does not
+touch the database, so none is needed. With ``--top`` the slowest imports
+of one run are listed (from ``python -X importtime``).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import orjson
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import asyncio, time, orjson
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+    return ready, time.perf_counter()
+
+ready, stopped = asyncio.run(lifespan())
+print(orjson.dumps({"import": imported - started, "startup": ready - imported, "shutdown": stopped - ready}).decode())
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=os.environ.copy(),
+        capture_output=True, text=True, check=True
+    )
+    return orjson.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    """(cumulative seconds, module) of the slowest imports of `import main`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, env=os.environ.copy(),
+        capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        imports.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure app import and lifespan startup time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    for phase in ("import", "startup", "shutdown"):
+        timings = [run[phase] * 1000 for run in runs]
+        print(f"{phase:>8}: median {statistics.median(timings):8.1f} ms  min {min(timings):8.1f} ms  max {max(timings):8.1f} ms")
+
+    if args.top:
+        print("\nSlowest imports (cumulative):")
+        for seconds, module in slowest_imports(args.top):
+            print(f"{seconds * 1000:8.1f} ms  {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import math
+import pytest
+from api.helper.hyperloglog import HyperLogLog
+
+
+def _sketch(items, precision=10):
+    sketch = HyperLogLog(precision)
+    for item in items:
+        sketch.add(item)
+    return sketch
+
+
+def _items(start, stop):
+    return [f"viewer-{i}" for i in range(start, stop)]
+
+
+def test_empty_sketch_counts_zero():
+    assert HyperLogLog().count() == 0
+
+
+def test_duplicates_are_counted_once():
+    once = _sketch(_items(0, 1000))
+    twice = _sketch(_items(0, 1000) * 2)
+    assert twice.registers == once.registers
+
+
+@pytest.mark.parametrize("precision", [4, 6, 8, 10, 12, 14])
+@pytest.mark.parametrize("cardinality", [10, 1000, 50000])
+def test_count_is_within_error_bounds(precision, cardinality):
+    estimate = _sketch(_items(0, cardinality), precision).count()
+    # Four standard errors; the hash is deterministic, so this cannot flake
+    bound = 4 * 1.04 / math.sqrt(1 << precision)
+    assert abs(estimate - cardinality) <= bound * cardinality + 1
+
+
+def test_merge_equals_sketch_of_union():
+    union = _sketch(_items(0, 3000))
+    merged = _sketch(_items(0, 2000))
+    merged.merge(_sketch(_items(1000, 3000)))
+    assert merged.registers == union.registers
+    assert merged.count() == union.count()
+
+
+@pytest.mark.parametrize("low, high", [(4, 10), (8, 12), (10, 14)])
+def test_merge_across_precisions_uses_the_lower_one(low, high):
+    expected = _sketch(_items(0, 3000), low)
+
+    merged = _sketch(_items(0, 2000), high)
+    merged.merge(_sketch(_items(1000, 3000), low))
+    assert (merged.precision, merged.size, merged.registers) == (low, 1 << low, expected.registers)
+
+    merged = _sketch(_items(0, 2000), low)
+    merged.merge(_sketch(_items(1000, 3000), high))
+    assert (merged.precision, merged.registers) == (low, expected.registers)
+
+
+@pytest.mark.parametrize("high", [6, 10, 14])
+def test_fold_equals_sketch_built_at_lower_precision(high):
+    items = _items(0, 5000)
+    sketch = _sketch(items, high)
+    for low in range(4, high + 1):
+        assert sketch.fold(low).registers == _sketch(items, low).registers
+
+
+def test_fold_to_higher_precision_is_rejected():
+    with pytest.raises(ValueError):
+        HyperLogLog(8).fold(10)
+
+
+@pytest.mark.parametrize("precision", [4, 10, 14])
+def test_bytes_round_trip(precision):
+    sketch = _sketch(_items(0, 500), precision)
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.precision == precision
+    assert restored.count() == sketch.count()
+
+
+@pytest.mark.parametrize("size", [0, 8, 100, 1023])
+def test_from_bytes_rejects_invalid_sizes(size):
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(bytes(size))
+
+
+def test_registers_must_match_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10, bytes(512))
@@ -0,0 +1,31 @@
+"""
+EXPLAIN each route query (see api.cli.check_plans) against the database at
+DATABASE_URL, migrated with `alembic upgrade head`. Skipped unless it is a
+PostgreSQL database.
+"""
+import pytest
+from api.cli.check_plans import explain, plan_problems, plan_settings, route_queries
+from api.db import get_engine
+from config import get_settings
+
+settings = get_settings()
+
+pytestmark = pytest.mark.skipif(
+    not settings.DATABASE_URL.startswith("postgresql"),
+    reason="query plans need DATABASE_URL to point at a migrated PostgreSQL database"
+)
+
+
+@pytest.fixture(scope="module")
+def conn():
+    with get_engine().connect() as conn:
+        plan_settings(conn)
+        yield conn
+
+
+@pytest.mark.parametrize(
+    "statement, allowed",
+    [pytest.param(statement, allowed, id=name) for name, statement, allowed in route_queries()]
+)
+def test_route_query_uses_indexes(conn, statement, allowed):
+    assert plan_problems(explain(conn, statement), allowed) == []
@@ -0,0 +1,120 @@
+import asyncio
+import re
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.helper.rate_limit import MemoryRateLimitStore, RateLimitMiddleware, RateLimitRule, default_rules, parse_rate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _hit(store, key="key", capacity=3, period=60):
+    return asyncio.run(store.hit(key, capacity, period))
+
+
+@pytest.mark.parametrize("rate, expected", [("10/60", (10, 60.0)), ("5/3600", (5, 3600.0)), ("2/0.5", (2, 0.5))])
+def test_parse_rate(rate, expected):
+    assert parse_rate(rate) == expected
+
+
+@pytest.mark.parametrize("rate", ["10", "ten/60", "10/60/2"])
+def test_parse_rate_rejects_malformed_budgets(rate):
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+
+
+def test_default_rules_parse_the_configured_budgets():
+    rules = {rule.name: rule for rule in default_rules()}
+    assert set(rules) == {"login", "signup", "like", "comment"}
+    assert rules["like"].method == "PATCH"
+    assert rules["like"].path.match("/blogs/123/like")
+    assert all(rule.capacity > 0 and rule.period > 0 for rule in rules.values())
+
+
+def test_bucket_allows_capacity_then_reports_time_to_next_token():
+    store = MemoryRateLimitStore(clock=FakeClock())
+    assert [_hit(store) for _ in range(3)] == [0, 0, 0]
+    # 3 tokens per 60 s refill one token every 20 s
+    assert _hit(store) == pytest.approx(20)
+
+
+def test_bucket_refills_with_time():
+    clock = FakeClock()
+    store = MemoryRateLimitStore(clock=clock)
+    for _ in range(3):
+        _hit(store)
+
+    clock.advance(10)
+    assert _hit(store) == pytest.approx(10)
+    clock.advance(10)
+    assert _hit(store) == 0
+    assert _hit(store) == pytest.approx(20)
+
+
+def test_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    store = MemoryRateLimitStore(clock=clock)
+    _hit(store)
+    clock.advance(3600)
+    assert [_hit(store) for _ in range(3)] == [0, 0, 0]
+    assert _hit(store) > 0
+
+
+def test_keys_have_separate_buckets():
+    store = MemoryRateLimitStore(clock=FakeClock())
+    for _ in range(3):
+        _hit(store, key="a")
+    assert _hit(store, key="a") > 0
+    assert _hit(store, key="b") == 0
+
+
+def test_least_recently_used_key_is_evicted_and_starts_full():
+    store = MemoryRateLimitStore(max_keys=2, clock=FakeClock())
+    for _ in range(3):
+        _hit(store, key="a")
+    _hit(store, key="b")
+    _hit(store, key="c")
+    assert _hit(store, key="a") == 0
+
+
+def _client(clock):
+    app = FastAPI()
+
+    @app.post("/limited")
+    def limited():
+        return {"ok": True}
+
+    rule = RateLimitRule("limited", "POST", re.compile(r"^/limited$"), 2, 60)
+    app.add_middleware(RateLimitMiddleware, rules=[rule], store=MemoryRateLimitStore(clock=clock))
+    return TestClient(app)
+
+
+def test_rejected_request_gets_429_with_retry_after_rounded_up():
+    clock = FakeClock()
+    client = _client(clock)
+    assert client.post("/limited").status_code == 200
+    assert client.post("/limited").status_code == 200
+
+    response = client.post("/limited")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+    clock.advance(29.5)
+    assert client.post("/limited").headers["Retry-After"] == "1"
+    clock.advance(1)
+    assert client.post("/limited").status_code == 200
+
+
+def test_other_routes_are_not_limited():
+    client = _client(FakeClock())
+    for _ in range(5):
+        assert client.get("/limited").status_code == 405
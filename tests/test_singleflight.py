@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import pytest
+from api.helper.singleflight import SingleFlight
+
+
+def _gated(result=None, error=None):
+    """A blocking fetch that waits for ``release`` and counts its calls"""
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    return fetch, release, calls
+
+
+def test_concurrent_calls_share_one_fetch():
+    async def scenario():
+        flight = SingleFlight()
+        fetch, release, calls = _gated(result=42)
+        callers = [asyncio.ensure_future(flight.do("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        assert len(flight) == 1
+        release.set()
+        results = await asyncio.gather(*callers)
+        return flight, results, calls
+
+    flight, results, calls = asyncio.run(scenario())
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert flight.stats == {"executed": 1, "coalesced": 4, "errors": 0}
+    assert len(flight) == 0
+
+
+def test_different_keys_fetch_separately():
+    async def scenario():
+        flight = SingleFlight()
+        return flight, await asyncio.gather(
+            flight.do("a", lambda: "a"),
+            flight.do("b", lambda: "b"),
+        )
+
+    flight, results = asyncio.run(scenario())
+    assert results == ["a", "b"]
+    assert flight.stats["executed"] == 2
+    assert flight.stats["coalesced"] == 0
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    async def scenario():
+        flight = SingleFlight()
+        fetch, release, calls = _gated(error=ValueError("boom"))
+        callers = [asyncio.ensure_future(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        # The failed call is forgotten, so the next caller fetches again
+        retried = await flight.do("key", lambda: "fresh")
+        return flight, results, retried
+
+    flight, results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert retried == "fresh"
+    assert flight.stats == {"executed": 2, "coalesced": 2, "errors": 1}
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flight = SingleFlight()
+        fetch, release, calls = _gated(result="value")
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return flight, await second, calls
+
+    flight, result, calls = asyncio.run(scenario())
+    assert result == "value"
+    assert len(calls) == 1
+    assert flight.stats["errors"] == 0
+
+
+def test_fetch_outlives_every_caller_going_away():
+    async def scenario():
+        flight = SingleFlight()
+        fetch, release, calls = _gated(result="value")
+        caller = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        # A caller arriving meanwhile joins the call that is still running
+        joined = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        release.set()
+        return flight, await joined, calls
+
+    flight, result, calls = asyncio.run(scenario())
+    assert result == "value"
+    assert len(calls) == 1
+    assert flight.stats == {"executed": 1, "coalesced": 1, "errors": 0}